@@ -0,0 +1,129 @@
+# app/analytics.py
+import os
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from app.config import ANALYTICS_FETCH_SIZE
+from app.external_sort import write_json_array, write_ndjson
+
+_connection = None
+_lock = threading.Lock()
+
+
+def _cursor():
+    """A cursor on the shared in-process DuckDB database; one per call so threads don't share state."""
+    global _connection
+    with _lock:
+        if _connection is None:
+            import duckdb
+            _connection = duckdb.connect()
+        return _connection.cursor()
+
+
+# A nullstr that never occurs in real data, so no field is read as NULL
+NO_NULL = "\x1fno-null\x1f"
+
+
+def quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def source(path: str, all_varchar: bool = False) -> str:
+    """
+    DuckDB table function reading a CSV, JSON/NDJSON or Parquet file
+
+    Args:
+        all_varchar: Read CSV columns as strings, matching csv.DictReader output
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"File not found: {path}")
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix in (".csv", ".tsv"):
+        delimiter = "\t" if suffix == ".tsv" else ","
+        # Explicit header/delimiter: sniffing can't find them once every column is VARCHAR.
+        # Short rows are padded with NULLs, as csv.DictReader pads them with None.
+        options = f"header = true, delim = {_literal(delimiter)}, null_padding = true"
+        if all_varchar:
+            # Empty fields stay "" as in csv.DictReader; only padding produces NULL
+            options += f", all_varchar = true, nullstr = {_literal(NO_NULL)}"
+        return f"read_csv_auto({_literal(path)}, {options})"
+    if suffix in (".json", ".ndjson", ".jsonl"):
+        return f"read_json_auto({_literal(path)})"
+    if suffix == ".parquet":
+        return f"read_parquet({_literal(path)})"
+    raise ValueError(f"Unsupported file type for analytics: {path}")
+
+
+def sqlite_table(db_path: str, table: str) -> str:
+    """Table function scanning a SQLite table (e.g. ticket-sales.db tickets); DuckDB autoloads its sqlite extension."""
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"Database not found: {db_path}")
+    return f"sqlite_scan({_literal(db_path)}, {_literal(table)})"
+
+
+def iter_query(sql: str, params: Sequence = (), batch_size: int = ANALYTICS_FETCH_SIZE) -> Iterator[Dict[str, Any]]:
+    """Runs a query and yields rows as dicts, fetched batch_size at a time."""
+    cursor = _cursor()
+    try:
+        cursor.execute(sql, list(params))
+        columns = [column[0] for column in cursor.description]
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            for row in rows:
+                yield dict(zip(columns, row))
+    finally:
+        cursor.close()
+
+
+def filter_sql(table: str, filters: Optional[Dict[str, Any]] = None, columns: Optional[List[str]] = None,
+               order_by: Optional[List[str]] = None):
+    """
+    SELECT with only the needed columns and equality filters as parameters
+
+    DuckDB pushes the projection and the predicates down into the file scan.
+    """
+    select = ", ".join(quote(c) for c in columns) if columns else "*"
+    sql = f"SELECT {select} FROM {table}"
+    params = []
+    if filters:
+        sql += " WHERE " + " AND ".join(f"{quote(column)} = ?" for column in filters)
+        params = list(filters.values())
+    if order_by:
+        sql += " ORDER BY " + ", ".join(quote(c) for c in order_by)
+    return sql, params
+
+
+def aggregate_sql(table: str, group_by: List[str], metrics: Dict[str, str], where: Optional[str] = None):
+    """
+    GROUP BY query; metrics maps output names to SQL expressions, e.g.
+    {"revenue": "SUM(units * price)"}
+    """
+    keys = ", ".join(quote(c) for c in group_by)
+    selected = ", ".join([keys] + [f"{expr} AS {quote(name)}" for name, expr in metrics.items()])
+    sql = f"SELECT {selected} FROM {table}"
+    if where:
+        sql += f" WHERE {where}"
+    return sql + f" GROUP BY {keys} ORDER BY {keys}"
+
+
+def export(sql: str, output_path: str, params: Sequence = (), fmt: str = "json") -> int:
+    """
+    Streams query results to output_path
+
+    Args:
+        fmt: "json" (indent=4 array, as json.dumps(rows, indent=4)) or "ndjson"
+
+    Returns:
+        Number of rows written
+    """
+    rows = iter_query(sql, params)
+    # Dates and decimals are written as strings
+    if fmt == "ndjson":
+        return write_ndjson(output_path, rows, default=str)
+    return write_json_array(output_path, rows, default=str)
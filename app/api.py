@@ -1,7 +1,16 @@
 # app/api.py
+import asyncio
+
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
-from app.tasks import execute_task  # ✅ Only this import (No circular dependencies)
+from app.tasks import task_registry  # ✅ Only this import (No circular dependencies)
+from app.models import model_stats
+from app.embedding_cache import cache_stats
+from app.config import METRICS_ENABLED
+from app.jobs import job_queue
+from app.metrics import registry as metrics_registry
 
 router = APIRouter()
 
@@ -12,14 +21,65 @@ class EmbeddingRequest(BaseModel):
     sentences: list[str]
 
 @router.post("/run")
-async def run_task(request: TaskRequest):
-    """Receives a task request and executes it."""
+async def run_task(request: TaskRequest, wait: bool = False):
+    """Queues a task and returns its job id; with wait=true, responds with the result once done."""
+    # Matched once, off the event loop (the embedding fallback runs a model encode); the job runs that match
+    phrase, handler, pool = await run_in_threadpool(task_registry.resolve, request.task)
+    job, future = job_queue.submit(request.task, lambda: task_registry.run(phrase, handler), pool=pool)
+    if not wait:
+        return {"message": "Task submitted", "job_id": job["id"], "status": job["status"]}
+
+    # Awaiting the future keeps the event loop free while the worker runs
     try:
-        result = execute_task(request.task)
-        return {"message": "Task executed successfully", "result": result}
+        result = await asyncio.wrap_future(future)
+        return {"message": "Task executed successfully", "job_id": job["id"], "result": result}
+    except HTTPException:
+        raise
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/tasks/match")
+async def match_task(q: str, limit: int = 5):
+    """Ranks registered task phrases against a request without running anything."""
+    ranked = await run_in_threadpool(task_registry.match, q, limit)
+    return {"candidates": [{"task": phrase, "score": score} for phrase, score in ranked]}
+
+
+@router.get("/jobs")
+async def list_jobs():
+    """Reports queue depth, pool sizes and job counts per status."""
+    return job_queue.stats()
+
+
+@router.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    """Returns the status, and once finished the result or error, of a job."""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
+
+
+@router.get("/models")
+async def loaded_models():
+    """Reports load time and resident memory of every loaded model."""
+    return {"models": model_stats()}
+
+
+@router.get("/embedding-cache")
+async def embedding_cache_stats():
+    """Reports hit/miss counters of the on-disk embedding cache."""
+    return {"cache": cache_stats()}
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Per-task wall/CPU time, bytes, rows and model-encode histograms in Prometheus text format."""
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled (METRICS_ENABLED=0)")
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
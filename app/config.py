@@ -1,3 +1,91 @@
 import os
 
 DATA_PATH = os.getenv("DATA_PATH", "data/")
+
+# Models
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")
+# Comma separated "kind:name" specs loaded at startup, e.g. "sentence-transformers:all-MiniLM-L6-v2,whisper:base"
+WARMUP_MODELS = [spec.strip() for spec in os.getenv("WARMUP_MODELS", "").split(",") if spec.strip()]
+
+# Embedding cache
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", os.path.join(DATA_PATH, "embedding-cache.db"))
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+
+# Embedding output: format is taken from the suffix (.json, .npy or .emb), dtype applies to .npy/.emb
+EMBEDDINGS_PATH = os.getenv("EMBEDDINGS_PATH", "data/embeddings.json")
+EMBEDDING_DTYPE = os.getenv("EMBEDDING_DTYPE", "float32")
+# Comment embeddings written by the similar-comments task and reused while data/comments.txt is unchanged
+COMMENT_EMBEDDINGS_PATH = os.getenv("COMMENT_EMBEDDINGS_PATH", "data/comments.emb")
+
+# Job queue: "pool:workers" pairs, max queued+running jobs, finished jobs kept for /jobs lookups
+JOB_POOLS = os.getenv("JOB_POOLS", "default:4,model:1,subprocess:2")
+JOB_QUEUE_DEPTH = int(os.getenv("JOB_QUEUE_DEPTH", "100"))
+JOB_HISTORY = int(os.getenv("JOB_HISTORY", "1000"))
+
+# Task routing: fall back to MiniLM similarity when no keyword match scores above TASK_MIN_SCORE
+INTENT_EMBEDDINGS = os.getenv("INTENT_EMBEDDINGS", "0") == "1"
+TASK_MIN_SCORE = float(os.getenv("TASK_MIN_SCORE", "0.5"))
+INTENT_MIN_SIMILARITY = float(os.getenv("INTENT_MIN_SIMILARITY", "0.6"))
+
+# Log scanning: process pool size (0 = os.cpu_count()) and size above which files are mmapped
+LOG_SCAN_WORKERS = int(os.getenv("LOG_SCAN_WORKERS", "0"))
+LOG_MMAP_THRESHOLD = int(os.getenv("LOG_MMAP_THRESHOLD", str(1 << 20)))
+
+# Log catalog: seconds between full re-stats of every log (directory mtime is checked on each lookup)
+LOG_CATALOG_RESCAN = float(os.getenv("LOG_CATALOG_RESCAN", "30"))
+
+# External sort: in-memory budget per run (bytes) before spilling to temp files
+SORT_MEMORY_BUDGET = int(os.getenv("SORT_MEMORY_BUDGET", str(256 * 2**20)))
+SORT_TMP_DIR = os.getenv("SORT_TMP_DIR") or None
+
+# SQLite query layer
+SQL_POOL_SIZE = int(os.getenv("SQL_POOL_SIZE", "4"))
+SQL_TIMEOUT = float(os.getenv("SQL_TIMEOUT", "30"))
+SQL_FETCH_SIZE = int(os.getenv("SQL_FETCH_SIZE", "1000"))
+SQL_STATEMENT_CACHE = int(os.getenv("SQL_STATEMENT_CACHE", "256"))
+
+# DuckDB analytics: rows fetched per batch when streaming results out
+ANALYTICS_FETCH_SIZE = int(os.getenv("ANALYTICS_FETCH_SIZE", "10000"))
+
+# Transcription: ffmpeg decodes straight to memory; long audio is split into chunks
+# transcribed on TRANSCRIBE_WORKERS processes, each holding its own Whisper model
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg")
+TRANSCRIBE_CHUNK_SECONDS = float(os.getenv("TRANSCRIBE_CHUNK_SECONDS", "30"))
+TRANSCRIBE_WORKERS = int(os.getenv("TRANSCRIBE_WORKERS", "2"))
+
+# Bulk image processing: process pool size (0 = os.cpu_count())
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "0"))
+
+# HTTP fetcher: on-disk response cache (ETag / Last-Modified revalidation) and connection limits
+HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", os.path.join(DATA_PATH, "http-cache"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_PER_HOST = int(os.getenv("HTTP_PER_HOST", "4"))
+
+# Web scraping: default comma separated CSS selectors extracted by scrape_website
+SCRAPE_SELECTORS = [s.strip() for s in os.getenv("SCRAPE_SELECTORS", "p").split(",") if s.strip()]
+
+# Task plugins: comma separated modules exposing register_tasks(registry)
+TASK_PLUGINS = [name.strip() for name in os.getenv("TASK_PLUGINS", "tasks_phase_b").split(",") if name.strip()]
+# Phase B tasks that reach out to the network with hardcoded URLs are only registered when enabled
+PHASE_B_NETWORK_TASKS = os.getenv("PHASE_B_NETWORK_TASKS", "0") == "1"
+
+# /read streaming: chunk size, lines between line-index checkpoints, files whose index is kept
+READ_CHUNK_SIZE = int(os.getenv("READ_CHUNK_SIZE", str(1 << 16)))
+READ_LINE_INDEX_STRIDE = int(os.getenv("READ_LINE_INDEX_STRIDE", "4096"))
+READ_LINE_INDEX_FILES = int(os.getenv("READ_LINE_INDEX_FILES", "32"))
+
+# Prettier: persistent Node workers, expected version, per-file timeout, and formatted-content hashes for skipping
+PRETTIER_WORKERS = int(os.getenv("PRETTIER_WORKERS", "2"))
+PRETTIER_VERSION = os.getenv("PRETTIER_VERSION", "3.4.2")
+PRETTIER_TIMEOUT = float(os.getenv("PRETTIER_TIMEOUT", "30"))
+PRETTIER_CACHE_PATH = os.getenv("PRETTIER_CACHE_PATH", os.path.join(DATA_PATH, "prettier-cache.json"))
+
+# Bulk Markdown to HTML: process pool size (0 = os.cpu_count()) and comma separated Python-Markdown extensions
+MARKDOWN_WORKERS = int(os.getenv("MARKDOWN_WORKERS", "0"))
+MARKDOWN_EXTENSIONS = [name.strip() for name in os.getenv("MARKDOWN_EXTENSIONS", "").split(",") if name.strip()]
+
+# Per-task latency / resource histograms exposed on /metrics (Prometheus text); 0 disables recording
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
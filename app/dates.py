@@ -0,0 +1,114 @@
+# app/dates.py
+import re
+from itertools import islice
+from typing import Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+MONTHS = {name: i for i, name in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], 1)}
+BATCH_SIZE = 65536
+
+# The formats datagen.get_dates emits, each returning (year, month, day) groups
+ISO = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})")                                   # 2024-03-14
+SLASH = re.compile(r"(\d{4})/(\d{1,2})/(\d{1,2})(?: \d{1,2}:\d{2}:\d{2})?")          # 2024/03/14 15:30:45
+DAY_MON_YEAR = re.compile(r"(\d{1,2})-([A-Za-z]{3})-(\d{4})")                        # 14-Mar-2024
+MON_DAY_YEAR = re.compile(r"([A-Za-z]{3}) (\d{1,2}), (\d{4})")                       # Mar 14, 2024
+
+
+def parse_ymd(line: str) -> Tuple[int, int, int]:
+    """
+    Splits a date into (year, month, day) without raising
+
+    The format is picked from the line's shape, so each line is tried against
+    one precompiled pattern instead of every strptime format in turn.
+
+    Returns:
+        (year, month, day), or (0, 0, 0) when the line isn't a known format
+    """
+    line = line.strip()
+    if len(line) < 8:
+        return 0, 0, 0
+    if line[0].isalpha():
+        m = MON_DAY_YEAR.fullmatch(line)
+        if m:
+            return int(m[3]), MONTHS.get(m[1].lower(), 0), int(m[2])
+    elif line[4] == "-":
+        m = ISO.fullmatch(line)
+        if m:
+            return int(m[1]), int(m[2]), int(m[3])
+    elif line[4] == "/":
+        m = SLASH.fullmatch(line)
+        if m:
+            return int(m[1]), int(m[2]), int(m[3])
+    else:
+        m = DAY_MON_YEAR.fullmatch(line)
+        if m:
+            return int(m[3]), MONTHS.get(m[2].lower(), 0), int(m[1])
+    return 0, 0, 0
+
+
+def weekdays_from_ymd(years: np.ndarray, months: np.ndarray, days: np.ndarray) -> np.ndarray:
+    """
+    Vectorized weekday (Monday=0) for arrays of civil dates; invalid dates give -1
+
+    Uses the days-from-civil algorithm, so no datetime objects are created.
+    """
+    years = years.astype(np.int64)
+    months = months.astype(np.int64)
+    days = days.astype(np.int64)
+
+    leap = (years % 4 == 0) & ((years % 100 != 0) | (years % 400 == 0))
+    month_lengths = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+    valid = (months >= 1) & (months <= 12) & (days >= 1)
+    max_day = month_lengths[np.clip(months, 0, 12)] + (leap & (months == 2))
+    valid &= days <= max_day
+
+    y = years - (months <= 2)
+    era = np.floor_divide(y, 400)
+    yoe = y - era * 400
+    mp = (months + 9) % 12
+    doy = (153 * mp + 2) // 5 + days - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    days_since_epoch = era * 146097 + doe - 719468
+
+    # 1970-01-01 was a Thursday
+    weekdays = (days_since_epoch + 3) % 7
+    return np.where(valid, weekdays, -1).astype(np.int8)
+
+
+def parse_weekdays(lines: List[str]) -> np.ndarray:
+    """Weekday (Monday=0, -1 if unparseable) for every line of a batch."""
+    if not lines:
+        return np.empty(0, dtype=np.int8)
+    ymd = np.array([parse_ymd(line) for line in lines], dtype=np.int64)
+    return weekdays_from_ymd(ymd[:, 0], ymd[:, 1], ymd[:, 2])
+
+
+def iter_weekday_batches(lines: Iterable[str], batch_size: int = BATCH_SIZE) -> Iterator[Tuple[List[str], np.ndarray]]:
+    """Streams (stripped lines, weekdays) batches so large files are never fully loaded."""
+    lines = iter(lines)
+    while True:
+        batch = [line.strip() for line in islice(lines, batch_size)]
+        if not batch:
+            return
+        yield batch, parse_weekdays(batch)
+
+
+def count_weekdays(path: str, batch_size: int = BATCH_SIZE) -> dict:
+    """Counts the dates in a file for every weekday in a single pass."""
+    counts = np.zeros(7, dtype=np.int64)
+    with open(path, "r", encoding="utf-8") as f:
+        for _, weekdays in iter_weekday_batches(f, batch_size):
+            counts += np.bincount(weekdays[weekdays >= 0], minlength=7)
+    return dict(zip(WEEKDAYS, counts.tolist()))
+
+
+def weekday_filter(weekday: int, counts: np.ndarray):
+    """Pipeline stage keeping dates on weekday; counts (length 7) is updated for every weekday."""
+    def stage(lines):
+        for dates, weekdays in iter_weekday_batches(lines):
+            np.add(counts, np.bincount(weekdays[weekdays >= 0], minlength=7), out=counts)
+            yield from (date for date, hit in zip(dates, weekdays == weekday) if hit)
+    return stage
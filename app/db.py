@@ -0,0 +1,201 @@
+# app/db.py
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+from app.config import SQL_FETCH_SIZE, SQL_POOL_SIZE, SQL_STATEMENT_CACHE, SQL_TIMEOUT
+from app.metrics import count as count_metric
+
+# The progress handler runs every this many SQLite VM instructions
+PROGRESS_STEPS = 10000
+
+
+class QueryTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """
+    Reusable connections to one SQLite database
+
+    Read-only pools open "file:...?mode=ro" URIs. Each connection keeps its
+    own prepared-statement cache (cached_statements), so repeated queries
+    skip parsing. file_id is the (st_dev, st_ino) the pool was opened on, so
+    get_pool can tell when the file has been replaced.
+    """
+
+    def __init__(self, db_path: str, readonly: bool = True, size: int = SQL_POOL_SIZE, wal: bool = False):
+        self.file_id = _file_id(db_path)
+        if self.file_id is None:
+            raise FileNotFoundError(f"Database not found: {db_path}")
+        self.db_path = db_path
+        self.readonly = readonly
+        self.size = size
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        if wal:
+            self.enable_wal()
+
+    def enable_wal(self):
+        """Switches the database to WAL; opt-in, since the journal mode persists in the file."""
+        if self.readonly:
+            raise ValueError(f"Read-only pool can't change the journal mode of {self.db_path}")
+        # journal_mode is persistent, but can only be switched from a writable connection
+        try:
+            conn = sqlite3.connect(self.db_path)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logging.warning(f"Could not enable WAL on {self.db_path}: {e}")
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.readonly:
+            uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+            return sqlite3.connect(uri, uri=True, check_same_thread=False, cached_statements=SQL_STATEMENT_CACHE)
+        return sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=SQL_STATEMENT_CACHE)
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = SQL_TIMEOUT) -> Iterator[sqlite3.Connection]:
+        """
+        Borrows a connection; queries running longer than timeout seconds are interrupted
+
+        Blocks while all size connections are in use.
+        """
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+            if create:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    # Free the slot, or later callers would wait for a connection that never exists
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                conn = self._idle.get()
+
+        if timeout:
+            deadline = time.monotonic() + timeout
+            conn.set_progress_handler(lambda: time.monotonic() > deadline, PROGRESS_STEPS)
+        try:
+            yield conn
+            if not self.readonly:
+                conn.commit()
+        except sqlite3.OperationalError as e:
+            if not self.readonly:
+                conn.rollback()
+            if timeout and "interrupted" in str(e):
+                raise QueryTimeout(f"Query exceeded {timeout}s on {self.db_path}") from e
+            raise
+        except Exception:
+            if not self.readonly:
+                conn.rollback()
+            raise
+        finally:
+            conn.set_progress_handler(None, 0)
+            self._idle.put(conn)
+
+    def close(self):
+        """Closes the idle connections; ones still borrowed are closed when they are garbage collected."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+def _file_id(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_dev, stat.st_ino
+
+
+_pools: Dict[Tuple[str, bool], ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: str, readonly: bool = True, wal: bool = False) -> ConnectionPool:
+    """
+    Shared pool per (database, mode)
+
+    A pool whose file was deleted or replaced at the same path (e.g. datagen
+    recreating it) is closed and opened again, instead of reading the old inode.
+
+    Args:
+        wal: Switch the database to WAL (writable pools only; the mode persists in the file)
+    """
+    key = (os.path.abspath(db_path), readonly)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is not None and pool.file_id != _file_id(db_path):
+            logging.info(f"{db_path} was replaced, reopening its connection pool")
+            pool.close()
+            del _pools[key]
+            pool = None
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(db_path, readonly)
+        if wal:
+            pool.enable_wal()
+        return pool
+
+
+def format_row(row: Sequence) -> str:
+    return ", ".join(map(str, row))
+
+
+def query_scalar(db_path: str, query: str, params: Sequence = (), timeout: Optional[float] = SQL_TIMEOUT):
+    """First column of the first row, or None."""
+    with get_pool(db_path).connection(timeout) as conn:
+        row = conn.execute(query, params).fetchone()
+    return row[0] if row else None
+
+
+def stream_query(db_path: str, query: str, output_file: str, params: Sequence = (),
+                 batch_size: int = SQL_FETCH_SIZE, timeout: Optional[float] = SQL_TIMEOUT,
+                 formatter: Callable[[Sequence], str] = format_row) -> int:
+    """
+    Runs a read-only query and writes rows to output_file in fetchmany batches
+
+    The output file is only created once the first row arrives, and rows are
+    written one per line without a trailing newline.
+
+    Returns:
+        Number of rows written
+    """
+    count = 0
+    out = None
+    try:
+        with get_pool(db_path).connection(timeout) as conn:
+            cursor = conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                if out is None:
+                    out = open(output_file, "w", encoding="utf-8")
+                for row in rows:
+                    out.write(("\n" if count else "") + formatter(row))
+                    count += 1
+            cursor.close()
+    finally:
+        if out is not None:
+            out.close()
+            count_metric("bytes_written", os.path.getsize(output_file))
+    count_metric("rows", count)
+    return count
@@ -0,0 +1,80 @@
+# app/docs_index.py
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from app.metrics import count
+
+META_SUFFIX = ".meta.json"
+
+
+def read_title(path: str) -> Optional[str]:
+    """Returns the first "# " heading of a Markdown file, reading no further than that line."""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if line.startswith("# "):
+                return line[2:].strip()
+    return None
+
+
+def _load_json(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def build_index(docs_dir: str, index_path: Optional[str] = None, workers: Optional[int] = None) -> Dict[str, float]:
+    """
+    Writes {relative path: first H1 title} for every .md file under docs_dir
+
+    mtime and size of every file are kept next to the index (index.json.meta.json),
+    so later runs only re-read files that were added or changed.
+
+    Returns:
+        Files indexed, files re-read and elapsed seconds
+    """
+    start = time.perf_counter()
+    index_path = index_path or os.path.join(docs_dir, "index.json")
+    meta_path = index_path + META_SUFFIX
+    previous = _load_json(meta_path)
+
+    files = {}
+    for root, dirs, names in os.walk(docs_dir):
+        dirs.sort()
+        for name in sorted(names):
+            if name.endswith(".md"):
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                rel = os.path.relpath(path, docs_dir).replace(os.sep, "/")
+                files[rel] = (path, stat.st_mtime_ns, stat.st_size)
+
+    meta = {}
+    changed = []
+    for rel, (path, mtime, size) in files.items():
+        entry = previous.get(rel)
+        if entry and entry["mtime"] == mtime and entry["size"] == size:
+            meta[rel] = entry
+        else:
+            changed.append(rel)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        titles = executor.map(read_title, [files[rel][0] for rel in changed])
+        for rel, title in zip(changed, titles):
+            _, mtime, size = files[rel]
+            meta[rel] = {"title": title, "mtime": mtime, "size": size}
+
+    index = {rel: meta[rel]["title"] for rel in sorted(meta) if meta[rel]["title"] is not None}
+    with open(index_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=4)
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+    stats = {"files": len(files), "reindexed": len(changed), "seconds": round(time.perf_counter() - start, 4)}
+    logging.info(f"build_index {docs_dir}: {stats}")
+    count("rows", len(files))
+    return stats
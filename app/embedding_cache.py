@@ -0,0 +1,152 @@
+# app/embedding_cache.py
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.config import EMBEDDING_CACHE_MAX_ENTRIES, EMBEDDING_CACHE_PATH, EMBEDDING_MODEL
+from app.metrics import count
+from app.models import get_embedding_model
+
+
+class EmbeddingCache:
+    """
+    On-disk embedding cache keyed by sha256(model name + sentence)
+
+    Entries are stored as raw float32 bytes in SQLite and evicted least recently
+    used first once max_entries is exceeded.
+    """
+
+    def __init__(self, path: str = EMBEDDING_CACHE_PATH, max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        # Row count, read once on connect and kept up to date by inserts and evictions
+        self._entries = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    dim INTEGER NOT NULL,
+                    vector BLOB NOT NULL,
+                    last_used REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings(last_used)")
+            self._entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        return self._conn
+
+    @staticmethod
+    def key(model_name: str, sentence: str) -> str:
+        return hashlib.sha256(f"{model_name}\0{sentence}".encode("utf-8")).hexdigest()
+
+    def encode(self, sentences: List[str], model_name: str = EMBEDDING_MODEL) -> np.ndarray:
+        """
+        Embed sentences, encoding only the ones not already cached
+
+        Returns:
+            float32 matrix with one row per sentence, in input order
+        """
+        keys = [self.key(model_name, s) for s in sentences]
+        unique_keys = list(dict.fromkeys(keys))
+        now = time.time()
+
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            conn = self._connect()
+            # Stay below SQLite's bound-parameter limit
+            for start in range(0, len(unique_keys), 500):
+                chunk = unique_keys[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for key, vector in rows:
+                    found[key] = np.frombuffer(vector, dtype=np.float32)
+            if found:
+                conn.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?", ((now, k) for k in found))
+                conn.commit()
+
+            missing = [k for k in unique_keys if k not in found]
+            self.hits += len(unique_keys) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            # The model runs without the lock so cache hits in other threads aren't held up behind it
+            text_by_key = dict(zip(keys, sentences))
+            encode_start = time.perf_counter()
+            encoded = np.asarray(
+                get_embedding_model(model_name).encode([text_by_key[k] for k in missing]), dtype=np.float32
+            )
+            count("model_encode_seconds", time.perf_counter() - encode_start)
+            found.update(zip(missing, encoded))
+
+            with self._lock:
+                conn = self._connect()
+                # Another thread may have stored the same sentence meanwhile; its row is kept
+                inserted = conn.executemany(
+                    "INSERT OR IGNORE INTO embeddings (key, dim, vector, last_used) VALUES (?, ?, ?, ?)",
+                    ((k, len(found[k]), found[k].tobytes(), now) for k in missing),
+                ).rowcount
+                self._entries += inserted
+                self._evict(conn)
+                conn.commit()
+
+        logging.info(f"Embedding cache: {len(unique_keys) - len(missing)} hits, {len(missing)} misses")
+        count("rows", len(sentences))
+        if not sentences:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.stack([found[k] for k in keys])
+
+    def _evict(self, conn: sqlite3.Connection):
+        excess = self._entries - self.max_entries
+        if excess > 0:
+            excess = conn.execute(
+                "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                (excess,),
+            ).rowcount
+            self._entries -= excess
+            self.evictions += excess
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            self._connect()
+            entries = self._entries
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Shared process-wide cache
+embedding_cache = EmbeddingCache()
+
+
+def encode_cached(sentences: List[str], model_name: str = EMBEDDING_MODEL) -> np.ndarray:
+    """Embed sentences through the shared on-disk cache."""
+    return embedding_cache.encode(sentences, model_name)
+
+
+def cache_stats() -> Dict[str, float]:
+    """Hit/miss counters of the shared embedding cache."""
+    return embedding_cache.stats()
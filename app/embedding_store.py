@@ -0,0 +1,102 @@
+# app/embedding_store.py
+import json
+import os
+import struct
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# Raw format: MAGIC, uint32 header length, JSON header (dtype, shape, sentences),
+# space padding up to a 64-byte boundary, then the row-major matrix.
+RAW_MAGIC = b"DWEMB1\0\0"
+RAW_ALIGNMENT = 64
+
+FORMATS_BY_SUFFIX = {".json": "json", ".npy": "npy", ".emb": "raw"}
+BINARY_SUFFIXES = (".npy", ".emb")
+
+
+def sentences_path(path: str) -> str:
+    """Sidecar file holding the sentence order for .json / .npy outputs."""
+    return f"{path}.sentences.json"
+
+
+def detect_format(path: str, fmt: Optional[str] = None) -> str:
+    if fmt:
+        if fmt not in FORMATS_BY_SUFFIX.values():
+            raise ValueError(f"Unsupported embedding format: {fmt}")
+        return fmt
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix not in FORMATS_BY_SUFFIX:
+        raise ValueError(f"Cannot infer embedding format from {path}, expected one of {list(FORMATS_BY_SUFFIX)}")
+    return FORMATS_BY_SUFFIX[suffix]
+
+
+def save_embeddings(path: str, embeddings, sentences: List[str], fmt: Optional[str] = None,
+                    dtype: str = "float32") -> str:
+    """
+    Write an embedding matrix and its sentence order
+
+    Args:
+        path: Output file; the format is inferred from its suffix unless fmt is given
+        embeddings: (n, dim) matrix
+        sentences: Sentence for every row
+        fmt: "json" (legacy float lists), "npy" or "raw" (memory-mappable, sentences in header)
+        dtype: "float32" or "float16" for the binary formats
+
+    Returns:
+        The format that was written
+    """
+    fmt = detect_format(path, fmt)
+    matrix = np.ascontiguousarray(embeddings, dtype=np.dtype(dtype))
+
+    if fmt == "json":
+        with open(path, "w") as f:
+            json.dump(matrix.tolist(), f)
+    elif fmt == "npy":
+        np.save(path, matrix, allow_pickle=False)
+        # np.save appends .npy to paths without it
+        if not path.endswith(".npy"):
+            os.replace(f"{path}.npy", path)
+    else:
+        header = json.dumps({"dtype": matrix.dtype.str, "shape": list(matrix.shape), "sentences": sentences}).encode("utf-8")
+        prefix = len(RAW_MAGIC) + 4
+        header += b" " * (-(prefix + len(header)) % RAW_ALIGNMENT)
+        with open(path, "wb") as f:
+            f.write(RAW_MAGIC)
+            f.write(struct.pack("<I", len(header)))
+            f.write(header)
+            f.write(matrix.tobytes())
+        return fmt
+
+    with open(sentences_path(path), "w", encoding="utf-8") as f:
+        json.dump(sentences, f)
+    return fmt
+
+
+def load_embeddings(path: str) -> Tuple[np.ndarray, Optional[List[str]]]:
+    """
+    Open an embedding file, memory-mapped and read-only for the binary formats
+
+    Returns:
+        (matrix, sentences); sentences is None when no order was stored
+    """
+    with open(path, "rb") as f:
+        magic = f.read(len(RAW_MAGIC))
+        if magic == RAW_MAGIC:
+            header_len = struct.unpack("<I", f.read(4))[0]
+            header = json.loads(f.read(header_len))
+            matrix = np.memmap(path, dtype=np.dtype(header["dtype"]), mode="r",
+                               offset=len(RAW_MAGIC) + 4 + header_len, shape=tuple(header["shape"]))
+            return matrix, header["sentences"]
+
+    if path.endswith(".npy") or magic.startswith(b"\x93NUMPY"):
+        matrix = np.load(path, mmap_mode="r", allow_pickle=False)
+    else:
+        with open(path, "r") as f:
+            matrix = np.asarray(json.load(f), dtype=np.float32)
+
+    sentences = None
+    if os.path.exists(sentences_path(path)):
+        with open(sentences_path(path), "r", encoding="utf-8") as f:
+            sentences = json.load(f)
+    return matrix, sentences
@@ -0,0 +1,128 @@
+# app/external_sort.py
+import heapq
+import json
+import logging
+import os
+import sys
+import tempfile
+from typing import Any, Callable, Iterable, Iterator, List, Sequence, Tuple
+
+from app.config import SORT_MEMORY_BUDGET, SORT_TMP_DIR
+from app.metrics import count as count_metric
+from app.streaming import iter_json_records
+
+Record = Any
+KeyFunc = Callable[[Record], Tuple]
+
+
+def field_key(fields: Sequence[str], default: Any = "") -> KeyFunc:
+    """Sort key made of the given fields, missing fields sorting as default."""
+    fields = tuple(fields)
+    return lambda record: tuple(record.get(field, default) for field in fields)
+
+
+def _estimate_size(record: Record, key: Tuple) -> int:
+    """Rough in-memory footprint of a buffered record and its key."""
+    size = sys.getsizeof(record) + sys.getsizeof(key)
+    if isinstance(record, dict):
+        size += sum(sys.getsizeof(value) for value in record.values())
+    return size
+
+
+def _spill(run: List[Tuple[Tuple, int, Record]], tmp_dir: str) -> str:
+    run.sort(key=lambda item: item[0])
+    fd, path = tempfile.mkstemp(suffix=".run", dir=tmp_dir)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        for key, _, record in run:
+            # One compact [key, record] array per line
+            f.write(json.dumps([key, record], separators=(",", ":")))
+            f.write("\n")
+    return path
+
+
+def _read_run(path: str) -> Iterator[Tuple[Tuple, Record]]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            key, record = json.loads(line)
+            yield tuple(key), record
+
+
+def external_sort(records: Iterable[Record], key: KeyFunc, memory_budget: int = SORT_MEMORY_BUDGET,
+                  tmp_dir: str = SORT_TMP_DIR) -> Iterator[Record]:
+    """
+    Stable sort of an arbitrarily large record stream
+
+    Records are buffered until memory_budget is reached, then the sorted run is
+    spilled to a temp file; runs are k-way merged at the end. Input that fits
+    in one run is sorted in memory without touching disk.
+    """
+    run: List[Tuple[Tuple, int, Record]] = []
+    run_bytes = 0
+    run_paths: List[str] = []
+    with tempfile.TemporaryDirectory(prefix="sort-", dir=tmp_dir) as work_dir:
+        for seq, record in enumerate(records):
+            record_key = key(record)
+            run.append((record_key, seq, record))
+            run_bytes += _estimate_size(record, record_key)
+            if run_bytes >= memory_budget:
+                run_paths.append(_spill(run, work_dir))
+                run, run_bytes = [], 0
+
+        if not run_paths:
+            run.sort(key=lambda item: item[0])
+            for _, _, record in run:
+                yield record
+            return
+
+        if run:
+            run_paths.append(_spill(run, work_dir))
+        del run
+        logging.info(f"external_sort: merging {len(run_paths)} runs")
+        # heapq.merge keeps equal keys in run order, so the sort stays stable
+        for _, record in heapq.merge(*(_read_run(path) for path in run_paths), key=lambda item: item[0]):
+            yield record
+
+
+def write_json_array(path: str, records: Iterable[Record], indent: int = 4, default=None) -> int:
+    """Streams records into a JSON array formatted exactly like json.dump(records, f, indent=indent)."""
+    count = 0
+    pad = " " * indent
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(",\n" if count else "[\n")
+            f.write(pad + json.dumps(record, indent=indent, default=default).replace("\n", "\n" + pad))
+            count += 1
+        f.write("\n]" if count else "[]")
+    count_metric("rows", count)
+    count_metric("bytes_written", os.path.getsize(path))
+    return count
+
+
+def write_ndjson(path: str, records: Iterable[Record], default=None) -> int:
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, default=default))
+            f.write("\n")
+            count += 1
+    count_metric("rows", count)
+    count_metric("bytes_written", os.path.getsize(path))
+    return count
+
+
+def sort_json_file(input_path: str, output_path: str, keys: Sequence[str], memory_budget: int = SORT_MEMORY_BUDGET,
+                   output_format: str = "json") -> int:
+    """
+    Sorts a JSON array or NDJSON file by keys into output_path
+
+    Args:
+        output_format: "json" (indent=4 array, as json.dump wrote it) or "ndjson"
+
+    Returns:
+        Number of records written
+    """
+    count_metric("bytes_read", os.path.getsize(input_path))
+    records = external_sort(iter_json_records(input_path), field_key(keys), memory_budget)
+    if output_format == "ndjson":
+        return write_ndjson(output_path, records)
+    return write_json_array(output_path, records)
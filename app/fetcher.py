@@ -0,0 +1,257 @@
+# app/fetcher.py
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.config import (HTTP_CACHE_DIR, HTTP_MAX_CONNECTIONS, HTTP_PER_HOST, HTTP_RETRIES,
+                        HTTP_TIMEOUT)
+from app.metrics import count
+
+CHUNK_SIZE = 1 << 16
+RETRY_STATUSES = {429, 502, 503, 504}
+
+
+def _partial_path(path: str) -> str:
+    """Temp file next to path, unique per process and task, moved into place with os.replace once complete."""
+    return f"{path}.{os.getpid()}.{id(asyncio.current_task())}.part"
+
+
+class ResponseCache:
+    """
+    On-disk response bodies keyed by sha1(url), with their ETag / Last-Modified
+
+    Each entry is a <key>.body file plus a <key>.json metadata file, so a 304
+    is answered by copying the stored body instead of downloading it again.
+    """
+
+    def __init__(self, directory: str = HTTP_CACHE_DIR):
+        self.directory = directory
+
+    def _paths(self, url: str) -> Tuple[str, str]:
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{key}.body"), os.path.join(self.directory, f"{key}.json")
+
+    def lookup(self, url: str) -> Optional[Dict[str, str]]:
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if meta.get("url") != url or not os.path.exists(body_path):
+            return None
+        meta["body_path"] = body_path
+        return meta
+
+    def validators(self, url: str) -> Dict[str, str]:
+        """Conditional request headers for a cached url."""
+        meta = self.lookup(url)
+        headers = {}
+        if meta and meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta and meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def temp_path(self, url: str) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        return self._paths(url)[0] + f".{os.getpid()}.{id(asyncio.current_task())}.tmp"
+
+    def store(self, url: str, temp_path: str, response: httpx.Response) -> str:
+        """Moves a fully downloaded body into place and records its validators."""
+        body_path, meta_path = self._paths(url)
+        os.replace(temp_path, body_path)
+        meta = {
+            "url": url,
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+            "content_type": response.headers.get("content-type"),
+        }
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        return body_path
+
+
+def _cacheable(response: httpx.Response) -> bool:
+    has_validator = "etag" in response.headers or "last-modified" in response.headers
+    return has_validator and "no-store" not in response.headers.get("cache-control", "")
+
+
+class Fetcher:
+    """
+    Async downloader on one pooled httpx client
+
+    Connections are reused across every URL of a batch, at most per_host
+    requests run against the same host at once, and responses carrying an
+    ETag or Last-Modified are revalidated with conditional requests.
+
+    Use as an async context manager:
+
+        async with Fetcher() as fetcher:
+            results = await fetcher.fetch_all({url: path, ...})
+    """
+
+    def __init__(self, cache: Optional[ResponseCache] = None, per_host: int = HTTP_PER_HOST,
+                 max_connections: int = HTTP_MAX_CONNECTIONS, timeout: float = HTTP_TIMEOUT,
+                 retries: int = HTTP_RETRIES, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.cache = cache if cache is not None else ResponseCache()
+        self.per_host = per_host
+        self.retries = retries
+        self._client = httpx.AsyncClient(
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            # Connection failures are retried by the transport, 429/5xx responses in fetch
+            transport=transport or httpx.AsyncHTTPTransport(retries=retries),
+        )
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    async def __aenter__(self) -> "Fetcher":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._client.aclose()
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host)
+        return self._host_limits[host]
+
+    async def fetch(self, url: str, output_path: Optional[str] = None,
+                    sink: Optional[Callable[[bytes], None]] = None,
+                    on_headers: Optional[Callable[[httpx.Headers], None]] = None) -> Dict[str, object]:
+        """
+        Downloads url, streaming the body to output_path (and the cache)
+
+        sink, when given, is called with every chunk as it arrives (or with the
+        cached body on a 304), so the body can be processed during the download.
+        on_headers is called with the response headers (the cached Content-Type
+        on a 304) before the first chunk, e.g. to pick up the charset.
+
+        Returns:
+            url, status, bytes written, whether the cached copy was used, elapsed
+            seconds, and path (output_path, or the cached body when none is given)
+        """
+        start = time.perf_counter()
+        async with self._host_limit(url):
+            for attempt in range(self.retries + 1):
+                try:
+                    result = await self._fetch_once(url, output_path, sink, on_headers)
+                    break
+                except httpx.HTTPStatusError as e:
+                    if e.response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                        raise
+                await asyncio.sleep(0.5 * 2 ** attempt)
+        result["seconds"] = round(time.perf_counter() - start, 4)
+        count("bytes_read", result["bytes"])
+        return result
+
+    async def _fetch_once(self, url: str, output_path: Optional[str], sink: Optional[Callable[[bytes], None]],
+                          on_headers: Optional[Callable[[httpx.Headers], None]],
+                          conditional: bool = True) -> Dict[str, object]:
+        headers = self.cache.validators(url) if conditional else {}
+        async with self._client.stream("GET", url, headers=headers) as response:
+            meta = self.cache.lookup(url) if response.status_code == 304 else None
+            if response.status_code == 304 and meta is None:
+                # The cached body went away after the request was sent; ask again without validators
+                logging.warning(f"304 for {url} but its cache entry is gone, refetching")
+                return await self._fetch_once(url, output_path, sink, on_headers, conditional=False)
+            elif response.status_code == 304:
+                body_path = meta["body_path"]
+                if on_headers:
+                    on_headers(httpx.Headers({"content-type": meta["content_type"]} if meta.get("content_type") else {}))
+                if output_path:
+                    partial_path = _partial_path(output_path)
+                    shutil.copyfile(body_path, partial_path)
+                    os.replace(partial_path, output_path)
+                if sink:
+                    with open(body_path, "rb") as f:
+                        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                            sink(chunk)
+                return {"url": url, "status": 304, "bytes": os.path.getsize(body_path),
+                        "cached": True, "path": output_path or body_path}
+            if response.status_code >= 400:
+                await response.aread()
+                response.raise_for_status()
+            if on_headers:
+                on_headers(response.headers)
+
+            # Without an output file or sink the body only lives in the cache
+            keep = _cacheable(response) or not (output_path or sink)
+            cache_path = self.cache.temp_path(url) if keep else None
+            # Like the cache body, the output only appears at output_path once the download completed
+            partial_path = _partial_path(output_path) if output_path else None
+            temp_paths = [path for path in (partial_path, cache_path) if path]
+            outputs = [open(path, "wb") for path in temp_paths]
+            written = 0
+            try:
+                async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                    for out in outputs:
+                        out.write(chunk)
+                    if sink:
+                        sink(chunk)
+                    written += len(chunk)
+            except BaseException:
+                for out in outputs:
+                    out.close()
+                for path in temp_paths:
+                    os.remove(path)
+                raise
+            for out in outputs:
+                out.close()
+            if partial_path:
+                os.replace(partial_path, output_path)
+
+            path = self.cache.store(url, cache_path, response) if cache_path else None
+            return {"url": url, "status": response.status_code, "bytes": written, "cached": False,
+                    "path": output_path or path}
+
+    async def fetch_all(self, targets: Dict[str, Optional[str]]) -> List[Dict[str, object]]:
+        """
+        Fetches {url: output_path} concurrently; failures are reported, not raised
+
+        Returns:
+            One result per url in input order, with an "error" key for failures
+        """
+        async def guarded(url, path):
+            try:
+                return await self.fetch(url, path)
+            except Exception as e:
+                logging.error(f"Failed to fetch {url}: {e}")
+                return {"url": url, "error": str(e)}
+
+        return await asyncio.gather(*(guarded(url, path) for url, path in targets.items()))
+
+
+def fetch_urls(targets: Dict[str, Optional[str]], **options) -> List[Dict[str, object]]:
+    """Synchronous wrapper around Fetcher.fetch_all for worker threads and scripts."""
+    async def run():
+        async with Fetcher(**options) as fetcher:
+            return await fetcher.fetch_all(targets)
+
+    start = time.perf_counter()
+    results = asyncio.run(run())
+    seconds = time.perf_counter() - start
+    cached = sum(1 for result in results if result.get("cached"))
+    failed = sum(1 for result in results if "error" in result)
+    logging.info(f"fetch_urls: {len(results)} urls ({cached} from cache, {failed} failed) in {seconds:.3f}s")
+    return results
+
+
+def fetch_url(url: str, output_path: Optional[str] = None, sink: Optional[Callable[[bytes], None]] = None,
+              on_headers: Optional[Callable[[httpx.Headers], None]] = None, **options) -> Dict[str, object]:
+    """Fetches a single url, raising on failure."""
+    async def run():
+        async with Fetcher(**options) as fetcher:
+            return await fetcher.fetch(url, output_path, sink, on_headers)
+
+    return asyncio.run(run())
@@ -0,0 +1,150 @@
+# app/file_access.py
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import READ_CHUNK_SIZE, READ_LINE_INDEX_FILES, READ_LINE_INDEX_STRIDE
+from app.metrics import count
+
+
+def _newlines(chunk: bytes) -> np.ndarray:
+    """Positions of every newline byte in chunk."""
+    return np.flatnonzero(np.frombuffer(chunk, dtype=np.uint8) == 10)
+
+
+class LineIndex:
+    """
+    Sparse line index: the byte offset of every stride-th line start
+
+    Built in one vectorized pass over the raw bytes (nothing is decoded), it
+    lets "lines X-Y" requests seek close to line X instead of rescanning the
+    file from the start.
+    """
+
+    def __init__(self, path: str, stride: int = READ_LINE_INDEX_STRIDE, chunk_size: int = READ_CHUNK_SIZE):
+        self.stride = stride
+        self.checkpoints: List[int] = [0]  # checkpoints[k] = offset of 0-based line k * stride
+        newlines = 0
+        position = 0
+        last = b"\n"
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                positions = _newlines(chunk)
+                # Newline number newlines + i + 1 ends line k * stride - 1 when divisible by stride
+                first = (-newlines - 1) % stride
+                self.checkpoints.extend((positions[first::stride] + position + 1).tolist())
+                newlines += len(positions)
+                position += len(chunk)
+                last = chunk[-1:]
+        self.size = position
+        # A final line without a trailing newline still counts
+        self.lines = newlines + (last != b"\n")
+
+    def seek_line(self, f, line: int, chunk_size: int = READ_CHUNK_SIZE) -> int:
+        """Positions f at the start of 0-based line and returns the byte offset."""
+        k = min(line // self.stride, len(self.checkpoints) - 1)
+        position = self.checkpoints[k]
+        to_skip = line - k * self.stride
+        f.seek(position)
+        while to_skip > 0:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            positions = _newlines(chunk)
+            if len(positions) >= to_skip:
+                position += int(positions[to_skip - 1]) + 1
+                break
+            to_skip -= len(positions)
+            position += len(chunk)
+        f.seek(position)
+        return position
+
+
+_indexes: "OrderedDict[Tuple[str, int, int], LineIndex]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_line_index(path: str) -> LineIndex:
+    """Cached LineIndex, rebuilt when the file's mtime or size changes."""
+    st = os.stat(path)
+    key = (os.path.realpath(path), st.st_mtime_ns, st.st_size)
+    with _lock:
+        if key in _indexes:
+            _indexes.move_to_end(key)
+            return _indexes[key]
+    index = LineIndex(path)
+    with _lock:
+        for stale in [k for k in _indexes if k[0] == key[0]]:
+            del _indexes[stale]
+        _indexes[key] = index
+        while len(_indexes) > READ_LINE_INDEX_FILES:
+            _indexes.popitem(last=False)
+    return index
+
+
+def iter_line_range(path: str, first: int, last: Optional[int] = None,
+                    chunk_size: int = READ_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Streams the raw bytes of 1-based lines first..last (inclusive, last=None for EOF)
+
+    Returns bytes as stored, so no decoding or re-encoding happens.
+    """
+    index = get_line_index(path)
+    with open(path, "rb") as f:
+        index.seek_line(f, max(first, 1) - 1)
+        remaining = None if last is None else max(last - max(first, 1) + 1, 0)
+        while remaining is None or remaining > 0:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            count("bytes_read", len(chunk))
+            if remaining is not None:
+                positions = _newlines(chunk)
+                if len(positions) >= remaining:
+                    yield chunk[:int(positions[remaining - 1]) + 1]
+                    return
+                remaining -= len(positions)
+            yield chunk
+
+
+def tail_offset(path: str, lines: int, chunk_size: int = READ_CHUNK_SIZE) -> int:
+    """Byte offset where the last `lines` lines start, found by reading backwards from EOF."""
+    with open(path, "rb") as f:
+        position = f.seek(0, os.SEEK_END)
+        if position == 0 or lines <= 0:
+            return position
+        f.seek(position - 1)
+        # A trailing newline ends the last line rather than starting an empty one
+        needed = lines + (1 if f.read(1) == b"\n" else 0)
+        while position > 0:
+            step = min(chunk_size, position)
+            position -= step
+            f.seek(position)
+            chunk = f.read(step)
+            positions = _newlines(chunk)
+            if len(positions) >= needed:
+                return position + int(positions[-needed]) + 1
+            needed -= len(positions)
+        return 0
+
+
+def iter_file(path: str, start: int = 0, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            count("bytes_read", len(chunk))
+            yield chunk
+
+
+def gzip_chunks(chunks: Iterator[bytes], level: int = 6) -> Iterator[bytes]:
+    """Gzip-compresses a byte stream chunk by chunk."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
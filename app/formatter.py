@@ -0,0 +1,276 @@
+# app/formatter.py
+import hashlib
+import itertools
+import json
+import logging
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from app.config import PRETTIER_CACHE_PATH, PRETTIER_TIMEOUT, PRETTIER_VERSION, PRETTIER_WORKERS
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prettier_worker.js")
+
+
+class PrettierError(Exception):
+    pass
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def prettier_node_path(cwd: str = ".") -> Optional[str]:
+    """
+    Where the worker loads prettier from, without installing anything at request time
+
+    Returns:
+        None when cwd/node_modules has prettier, else the global node_modules
+        directory (the Dockerfile installs it there at build time)
+    """
+    if os.path.exists(os.path.join(cwd, "node_modules", "prettier", "package.json")):
+        return None
+    npm = shutil.which("npm") or shutil.which("npm.cmd")
+    if npm is None:
+        raise PrettierError("npm not found; Node.js is required for Prettier")
+    try:
+        root = subprocess.run([npm, "root", "-g"], check=True, capture_output=True, text=True,
+                              timeout=PRETTIER_TIMEOUT).stdout.strip()
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+        raise PrettierError(f"npm root -g failed: {e}")
+    if not os.path.exists(os.path.join(root, "prettier", "package.json")):
+        raise PrettierError(f"prettier is not installed; run npm install -g prettier@{PRETTIER_VERSION}")
+    return root
+
+
+class PrettierWorker:
+    """One long-lived Node process that keeps prettier loaded between files."""
+
+    def __init__(self, cwd: str = ".", timeout: float = PRETTIER_TIMEOUT):
+        node = shutil.which("node") or shutil.which("node.exe")
+        if node is None:
+            raise PrettierError("node not found; Node.js is required for Prettier")
+        env = os.environ.copy()
+        node_path = prettier_node_path(cwd)
+        if node_path is not None:
+            env["NODE_PATH"] = os.pathsep.join(filter(None, [node_path, env.get("NODE_PATH")]))
+        self.timeout = timeout
+        self._ids = itertools.count(1)
+        self._stderr = tempfile.TemporaryFile(mode="w+", encoding="utf-8")
+        self.process = subprocess.Popen(
+            [node, WORKER_SCRIPT], cwd=cwd, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=self._stderr, text=True, encoding="utf-8", bufsize=1,
+        )
+        # stdout is read on its own thread so _read() can give up on a hung worker
+        self._lines: "queue.Queue[str]" = queue.Queue()
+        threading.Thread(target=self._pump, daemon=True).start()
+        ready = self._read()
+        if ready is None or not ready.get("ready"):
+            error = self._error_output()
+            self.close()
+            raise PrettierError(f"Prettier worker failed to start: {error}")
+        self.version = ready.get("version")
+
+    def _pump(self):
+        for line in self.process.stdout:
+            self._lines.put(line)
+        self._lines.put("")
+
+    def _read(self) -> Optional[dict]:
+        """Next response line, None if the worker exited; kills the worker after timeout seconds."""
+        try:
+            line = self._lines.get(timeout=self.timeout)
+        except queue.Empty:
+            self.process.kill()
+            raise PrettierError(f"Prettier worker did not answer within {self.timeout}s")
+        try:
+            return json.loads(line) if line else None
+        except json.JSONDecodeError:
+            self.process.kill()
+            raise PrettierError(f"Prettier worker wrote invalid output: {line[:200]!r}")
+
+    def _error_output(self) -> str:
+        self._stderr.seek(0)
+        return self._stderr.read().strip()[-2000:]
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def format(self, filepath: str, content: str) -> Dict[str, object]:
+        """Returns {"formatted": str, "ms": float} or raises PrettierError."""
+        request_id = next(self._ids)
+        try:
+            self.process.stdin.write(json.dumps({"id": request_id, "filepath": filepath, "content": content}) + "\n")
+            self.process.stdin.flush()
+            response = self._read()
+        except (BrokenPipeError, OSError) as e:
+            response = None
+            logging.error(f"Prettier worker pipe closed: {e}")
+        if response is None:
+            raise PrettierError(f"Prettier worker exited: {self._error_output()}")
+        if response.get("id") != request_id:
+            raise PrettierError(f"Prettier worker answered request {response.get('id')}, expected {request_id}")
+        if "error" in response:
+            raise PrettierError(response["error"])
+        return response
+
+    def close(self):
+        if self.alive:
+            self.process.stdin.close()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self._stderr.close()
+
+
+class PrettierPool:
+    """
+    Reusable Prettier workers, started on first use
+
+    Files whose current content hash equals the hash recorded after their last
+    format are skipped without a round trip to Node. Hashes are kept in
+    PRETTIER_CACHE_PATH together with the prettier version that produced them.
+    """
+
+    def __init__(self, size: int = PRETTIER_WORKERS, cwd: str = ".", cache_path: str = PRETTIER_CACHE_PATH):
+        self.size = size
+        self.cwd = cwd
+        self.cache_path = cache_path
+        self._idle: "queue.LifoQueue[PrettierWorker]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._cache: Optional[Dict[str, Dict[str, str]]] = None
+        self.version: Optional[str] = None
+
+    def _acquire(self) -> PrettierWorker:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            create = self._created < self.size
+            if create:
+                self._created += 1
+        if not create:
+            return self._idle.get()
+        try:
+            worker = PrettierWorker(self.cwd)
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+        if self.version is None and worker.version != PRETTIER_VERSION:
+            logging.warning(f"Prettier {worker.version} found, PRETTIER_VERSION is {PRETTIER_VERSION}")
+        self.version = worker.version
+        return worker
+
+    def _current_version(self) -> str:
+        """Version of the running prettier, starting a worker if none has run yet."""
+        if self.version is None:
+            self._release(self._acquire())
+        return self.version
+
+    def _release(self, worker: PrettierWorker):
+        if worker.alive:
+            self._idle.put(worker)
+        else:
+            # A crashed worker is replaced on the next acquire
+            worker.close()
+            with self._lock:
+                self._created -= 1
+
+    def _load_cache(self) -> Dict[str, Dict[str, str]]:
+        if self._cache is None:
+            try:
+                with open(self.cache_path, "r", encoding="utf-8") as f:
+                    self._cache = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self._cache = {}
+        return self._cache
+
+    def _save_cache(self):
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+        with self._lock:
+            snapshot = json.dumps(self._cache)
+        with open(self.cache_path, "w", encoding="utf-8") as f:
+            f.write(snapshot)
+
+    def format_file(self, path: str) -> Dict[str, object]:
+        """
+        Formats one file in place
+
+        Returns:
+            {"path", "status": "formatted" | "unchanged" | "cached" | "error", "ms"}
+            where ms is the wall time for this file including the Node round trip
+        """
+        start = time.perf_counter()
+        key = os.path.abspath(path)
+        result = {"path": path}
+        try:
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                content = f.read()
+            digest = content_hash(content)
+            entry = self._load_cache().get(key)
+            # The version must be known first, or entries from another prettier would count as formatted
+            if entry and entry["hash"] == digest and entry["version"] == self._current_version():
+                result["status"] = "cached"
+            else:
+                worker = self._acquire()
+                try:
+                    formatted = worker.format(path, content)["formatted"]
+                finally:
+                    self._release(worker)
+                if formatted != content:
+                    with open(path, "w", encoding="utf-8", newline="") as f:
+                        f.write(formatted)
+                result["status"] = "unchanged" if formatted == content else "formatted"
+                with self._lock:
+                    self._cache[key] = {"hash": content_hash(formatted), "version": worker.version}
+        except (OSError, PrettierError) as e:
+            result.update(status="error", error=str(e))
+        result["ms"] = round((time.perf_counter() - start) * 1000, 2)
+        return result
+
+    def format_files(self, paths: List[str]) -> List[Dict[str, object]]:
+        """Formats a batch across the workers; results are in input order."""
+        if not paths:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.size, len(paths))) as executor:
+            results = list(executor.map(self.format_file, paths))
+        self._save_cache()
+        counts = {status: sum(1 for r in results if r["status"] == status)
+                  for status in ("formatted", "unchanged", "cached", "error")}
+        logging.info(f"Prettier: {len(results)} files {counts}, slowest {max(r['ms'] for r in results)} ms")
+        return results
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._created = 0
+
+
+_pool: Optional[PrettierPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_prettier_pool() -> PrettierPool:
+    """Shared pool for the process."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = PrettierPool()
+        return _pool
@@ -0,0 +1,273 @@
+# app/html_extract.py
+import codecs
+import re
+from collections import deque
+from html.parser import HTMLParser
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Elements that never have content or an end tag
+VOID_ELEMENTS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+_BLOCKS = {"address", "article", "aside", "blockquote", "div", "dl", "fieldset", "footer", "form", "h1", "h2", "h3",
+           "h4", "h5", "h6", "header", "hr", "main", "nav", "ol", "p", "pre", "section", "table", "ul"}
+# An open element (key) is implicitly closed when one of these starts
+IMPLIED_END = {"p": _BLOCKS, "li": {"li"}, "option": {"option"}, "tr": {"tr"}, "td": {"td", "th", "tr"},
+               "th": {"td", "th", "tr"}, "dt": {"dt", "dd"}, "dd": {"dt", "dd"}}
+
+# Elements whose content is code, not text; like get_text(), their content is left out of matches
+SKIP_TEXT = {"script", "style"}
+# Bytes searched for a <meta charset> when the response declares none (the HTML prescan limit)
+SNIFF_BYTES = 1024
+_META_CHARSET = re.compile(rb"<meta[^>]+charset\s*=\s*[\"']?\s*([\w:.-]+)", re.IGNORECASE)
+_CONTENT_TYPE_CHARSET = re.compile(r"charset\s*=\s*[\"']?([\w:.-]+)", re.IGNORECASE)
+
+_COMPOUND = re.compile(r"([a-zA-Z][\w-]*|\*)?((?:[.#][\w-]+|\[[^\]]+\])*)")
+_PART = re.compile(r"([.#])([\w-]+)|\[\s*([\w-]+)\s*(=\s*[\"']?([^\"'\]]*)[\"']?\s*)?\]")
+
+
+def _known(encoding: Optional[str]) -> Optional[str]:
+    if not encoding:
+        return None
+    try:
+        return codecs.lookup(encoding).name
+    except LookupError:
+        return None
+
+
+def charset_from_content_type(content_type: Optional[str]) -> Optional[str]:
+    """The charset parameter of a Content-Type header, if Python knows it."""
+    match = _CONTENT_TYPE_CHARSET.search(content_type or "")
+    return _known(match[1]) if match else None
+
+
+def sniff_charset(head: bytes) -> str:
+    """Encoding from a BOM or <meta charset> in the first bytes, else utf-8 when they decode as such, else cp1252."""
+    for bom, encoding in ((codecs.BOM_UTF8, "utf-8-sig"), (codecs.BOM_UTF16_LE, "utf-16"),
+                          (codecs.BOM_UTF16_BE, "utf-16")):
+        if head.startswith(bom):
+            return encoding
+    match = _META_CHARSET.search(head[:SNIFF_BYTES])
+    declared = _known(match[1].decode("ascii", "replace")) if match else None
+    if declared:
+        return declared
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "cp1252"
+
+
+class Selector:
+    """
+    A small CSS subset matched against the open-element stack
+
+    Supports tag, *, .class, #id, [attr], [attr=value], descendant (space) and
+    child (>) combinators. A trailing "@attr" extracts that attribute instead of
+    the element's text, e.g. "a.external@href".
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        selector, _, self.attribute = text.partition("@")
+        self.attribute = self.attribute.strip() or None
+        self.steps: List[Tuple[str, dict]] = []  # (combinator, compound), right-most last
+        combinator = " "
+        for token in selector.replace(">", " > ").split():
+            if token == ">":
+                combinator = ">"
+                continue
+            self.steps.append((combinator, self._parse_compound(token)))
+            combinator = " "
+        if not self.steps:
+            raise ValueError(f"Empty selector: {text!r}")
+
+    @staticmethod
+    def _parse_compound(token: str) -> dict:
+        match = _COMPOUND.fullmatch(token)
+        if not match:
+            raise ValueError(f"Unsupported selector: {token!r}")
+        compound = {"tag": (match[1] or "*").lower(), "id": None, "classes": set(), "attrs": []}
+        for kind, name, attr, equals, value in _PART.findall(match[2]):
+            if kind == "#":
+                compound["id"] = name
+            elif kind == ".":
+                compound["classes"].add(name)
+            else:
+                compound["attrs"].append((attr.lower(), value if equals else None))
+        return compound
+
+    @staticmethod
+    def _matches(compound: dict, element: "Element") -> bool:
+        if compound["tag"] != "*" and compound["tag"] != element.tag:
+            return False
+        if compound["id"] and element.attrs.get("id") != compound["id"]:
+            return False
+        if compound["classes"] and not compound["classes"] <= element.classes:
+            return False
+        for attr, value in compound["attrs"]:
+            if attr not in element.attrs or (value is not None and element.attrs[attr] != value):
+                return False
+        return True
+
+    def matches(self, stack: List["Element"]) -> bool:
+        """Whether the innermost element of stack matches, given its ancestors."""
+        return self._match_from(len(self.steps) - 1, stack, len(stack) - 1)
+
+    def _match_from(self, step: int, stack: List["Element"], position: int) -> bool:
+        combinator, compound = self.steps[step]
+        if not self._matches(compound, stack[position]):
+            return False
+        if step == 0:
+            return True
+        if combinator == ">":
+            return position > 0 and self._match_from(step - 1, stack, position - 1)
+        return any(self._match_from(step - 1, stack, ancestor) for ancestor in range(position - 1, -1, -1))
+
+
+class Element:
+    __slots__ = ("tag", "attrs", "classes")
+
+    def __init__(self, tag: str, attrs: Dict[str, str]):
+        self.tag = tag
+        self.attrs = attrs
+        self.classes = set((attrs.get("class") or "").split())
+
+
+class _Capture:
+    __slots__ = ("selector", "depth", "skip_level", "parts", "done")
+
+    def __init__(self, selector: str, depth: int, skip_level: int):
+        self.selector = selector
+        self.depth = depth
+        # Open script/style elements around the match; text nested in further ones is skipped
+        self.skip_level = skip_level
+        self.parts: List[str] = []
+        self.done = False
+
+
+class StreamingExtractor(HTMLParser):
+    """
+    Incremental, selector-based HTML extraction
+
+    Feed bytes or text as it arrives and read matches from results(); only the
+    open-element stack and the text of currently open matches are held, so
+    memory stays flat however large the page is. Matches come out in document
+    (start tag) order as (selector, value) pairs.
+
+    Bytes are decoded with encoding when given (e.g. the Content-Type charset,
+    see set_encoding); otherwise the first SNIFF_BYTES are buffered and the
+    encoding is taken from a BOM or <meta charset>.
+    """
+
+    def __init__(self, selectors: Sequence[str], encoding: Optional[str] = None):
+        super().__init__(convert_charrefs=True)
+        self.selectors = [Selector(s) for s in selectors]
+        # Tags that can complete a match; other start tags skip selector matching
+        self._target_tags = {s.steps[-1][1]["tag"] for s in self.selectors}
+        self._encoding = _known(encoding)
+        self._decoder = None
+        self._head = b""
+        self._stack: List[Element] = []
+        self._skipped = 0  # open script/style elements
+        self._pending: Deque[_Capture] = deque()
+        self._open: List[_Capture] = []
+
+    def set_encoding(self, encoding: Optional[str]):
+        """Sets the byte encoding (ignored once decoding has started or when unknown)."""
+        if self._decoder is None and _known(encoding):
+            self._encoding = _known(encoding)
+
+    def _start_decoder(self, final: bool = False) -> bool:
+        if self._decoder is None and (self._encoding or final or len(self._head) >= SNIFF_BYTES):
+            encoding = self._encoding or sniff_charset(self._head)
+            self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        return self._decoder is not None
+
+    def feed(self, data) -> None:
+        if isinstance(data, bytes):
+            if self._decoder is None:
+                self._head += data
+                if not self._start_decoder():
+                    return
+                data, self._head = self._head, b""
+            data = self._decoder.decode(data)
+        super().feed(data)
+
+    def close(self) -> None:
+        self._start_decoder(final=True)
+        head, self._head = self._head, b""
+        super().feed(self._decoder.decode(head, final=True))
+        super().close()
+        self._pop_to(0)
+
+    def results(self) -> Iterator[Tuple[str, str]]:
+        """Drains the matches that are complete so far."""
+        while self._pending and self._pending[0].done:
+            capture = self._pending.popleft()
+            yield capture.selector, "".join(capture.parts)
+
+    def _pop_to(self, depth: int):
+        if self._skipped:
+            self._skipped -= sum(1 for element in self._stack[depth:] if element.tag in SKIP_TEXT)
+        del self._stack[depth:]
+        while self._open and self._open[-1].depth > depth:
+            self._open.pop().done = True
+
+    def handle_starttag(self, tag, attrs):
+        top = self._stack[-1].tag if self._stack else None
+        if top in IMPLIED_END and tag in IMPLIED_END[top]:
+            self._pop_to(len(self._stack) - 1)
+
+        self._stack.append(Element(tag, {name: value or "" for name, value in attrs}))
+        if tag in SKIP_TEXT:
+            self._skipped += 1
+        if tag not in self._target_tags and "*" not in self._target_tags:
+            if tag in VOID_ELEMENTS:
+                self._stack.pop()
+            return
+        for selector in self.selectors:
+            if not selector.matches(self._stack):
+                continue
+            capture = _Capture(selector.text, len(self._stack), self._skipped)
+            self._pending.append(capture)
+            if selector.attribute:
+                capture.parts.append(self._stack[-1].attrs.get(selector.attribute, ""))
+                capture.done = True
+            else:
+                self._open.append(capture)
+        if tag in VOID_ELEMENTS:
+            self._pop_to(len(self._stack) - 1)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self._pop_to(len(self._stack) - 1)
+
+    def handle_endtag(self, tag):
+        # Close the nearest open element with this tag; stray end tags are ignored
+        for depth in range(len(self._stack) - 1, -1, -1):
+            if self._stack[depth].tag == tag:
+                self._pop_to(depth)
+                return
+
+    def handle_data(self, data):
+        for capture in self._open:
+            if capture.skip_level == self._skipped:
+                capture.parts.append(data)
+
+
+def extract_stream(chunks: Iterable, selectors: Sequence[str],
+                   encoding: Optional[str] = None) -> Iterator[Tuple[str, str]]:
+    """Yields (selector, value) matches while chunks (bytes or str) are consumed."""
+    parser = StreamingExtractor(selectors, encoding)
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from parser.results()
+    parser.close()
+    yield from parser.results()
+
+
+def extract_file(path: str, selectors: Sequence[str], encoding: Optional[str] = None,
+                 chunk_size: int = 1 << 16) -> Iterator[Tuple[str, str]]:
+    """Yields matches from an HTML file read in chunks."""
+    with open(path, "rb") as f:
+        yield from extract_stream(iter(lambda: f.read(chunk_size), b""), selectors, encoding)
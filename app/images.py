@@ -0,0 +1,180 @@
+# app/images.py
+import glob
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from app.config import IMAGE_WORKERS
+from app.metrics import count
+
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".webp", ".bmp", ".gif", ".tif", ".tiff")
+MANIFEST_NAME = ".images-manifest.json"
+# Below this many images a process pool costs more than it saves
+MIN_PARALLEL_FILES = 4
+# Resize from at least this multiple of the target size after draft/reduce, keeping LANCZOS quality
+REDUCING_GAP = 2.0
+
+
+def fit_size(size: Tuple[int, int], box: Tuple[int, int]) -> Tuple[int, int]:
+    """Largest size with the aspect ratio of size that fits in box (never upscales)."""
+    width, height = size
+    scale = min(box[0] / width, box[1] / height, 1.0)
+    return max(round(width * scale), 1), max(round(height * scale), 1)
+
+
+def file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def output_name(rel: str) -> str:
+    """rel with a .jpg suffix; other formats keep theirs (a.png -> a.png.jpg) so a.png and a.jpg can't collide."""
+    return rel if rel.lower().endswith(".jpg") else rel + ".jpg"
+
+
+def process_image(input_path: str, output_path: str, max_size=(800, 800), quality: int = 85) -> Tuple[int, int]:
+    """
+    Downscales an image to fit max_size and saves it as a JPEG
+
+    JPEGs are decoded straight at a reduced DCT scale (Image.draft) and other
+    formats are shrunk with Image.reduce before the final LANCZOS pass, so
+    large originals are never fully decoded at full resolution.
+
+    Returns:
+        The saved (width, height)
+    """
+    with Image.open(input_path) as img:
+        target = fit_size(img.size, max_size)
+        if img.format == "JPEG":
+            # Picks the smallest 1/2, 1/4 or 1/8 scale that is still >= the requested size
+            img.draft("RGB", (int(target[0] * REDUCING_GAP), int(target[1] * REDUCING_GAP)))
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        factor = int(min(img.width / target[0], img.height / target[1]) / REDUCING_GAP)
+        if factor >= 2:
+            img = img.reduce(factor)
+        if img.size != target:
+            img = img.resize(target, Image.Resampling.LANCZOS)
+
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        img.save(output_path, "JPEG", quality=quality, optimize=True)
+        return img.size
+
+
+def _process(args) -> Tuple[str, str, Optional[str]]:
+    """Worker: returns (rel, status, content hash or error message)."""
+    rel, input_path, output_path, max_size, quality, known_hash = args
+    try:
+        digest = file_hash(input_path)
+        # mtime changed but the bytes didn't (copied, touched): keep the existing output
+        if digest == known_hash and os.path.exists(output_path):
+            return rel, "unchanged", digest
+        process_image(input_path, output_path, max_size, quality)
+        return rel, "processed", digest
+    except Exception as e:
+        return rel, "failed", str(e)
+
+
+def _collect(source: str) -> Tuple[str, List[str]]:
+    """(root, sorted image paths) for a directory or a glob pattern."""
+    if os.path.isdir(source):
+        root = source
+        paths = [os.path.join(dirpath, name) for dirpath, _, names in os.walk(source) for name in names]
+    elif os.path.isfile(source):
+        return os.path.dirname(source) or ".", [source] if source.lower().endswith(IMAGE_SUFFIXES) else []
+    else:
+        root = source
+        while glob.has_magic(root):
+            root = os.path.dirname(root)
+        paths = glob.glob(source, recursive=True)
+    return root or ".", sorted(p for p in paths if p.lower().endswith(IMAGE_SUFFIXES) and os.path.isfile(p))
+
+
+def process_images(source: str, output_dir: str, max_size=(800, 800), quality: int = 85,
+                   workers: Optional[int] = None, force: bool = False) -> Dict[str, float]:
+    """
+    Compresses and resizes every image in a directory or glob into output_dir
+
+    Outputs keep their relative path; non-.jpg sources get ".jpg" appended
+    (photo.png -> photo.png.jpg) so different sources never share an output. Source mtime, size and
+    hash are kept in output_dir/.images-manifest.json, so images whose outputs
+    are up to date are skipped without being opened.
+
+    Args:
+        source: Directory (walked recursively), glob (e.g. "data/photos/**/*.jpg") or a single image
+        output_dir: Destination directory
+        max_size: Bounding box (width, height); aspect ratio is preserved
+        quality: JPEG quality (1-100)
+        workers: Process pool size, defaults to IMAGE_WORKERS or the CPU count
+        force: Reprocess everything
+
+    Returns:
+        Image counts (processed, skipped, failed), elapsed seconds and images/sec
+    """
+    start = time.perf_counter()
+    root, paths = _collect(source)
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        previous = {}
+
+    options = [list(max_size), quality]
+    manifest, jobs, stats_by_rel = {}, [], {}
+    for path in paths:
+        rel = os.path.relpath(path, root).replace(os.sep, "/")
+        output_path = os.path.join(output_dir, output_name(rel))
+        stat = os.stat(path)
+        stats_by_rel[rel] = (stat.st_mtime_ns, stat.st_size)
+        entry = previous.get(rel) if not force and previous.get(rel, {}).get("options") == options else None
+        if entry and entry["mtime"] == stat.st_mtime_ns and entry["size"] == stat.st_size and os.path.exists(output_path):
+            manifest[rel] = entry
+            continue
+        jobs.append((rel, path, output_path, tuple(max_size), quality, entry["hash"] if entry else None))
+
+    workers = workers or IMAGE_WORKERS or os.cpu_count() or 1
+    skipped = len(paths) - len(jobs)
+    failed = 0
+    if workers > 1 and len(jobs) >= MIN_PARALLEL_FILES:
+        # spawn, not fork: this runs on a request thread of the multi-threaded server
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            results = list(executor.map(_process, jobs, chunksize=max(len(jobs) // (workers * 4), 1)))
+    else:
+        results = [_process(job) for job in jobs]
+
+    for rel, status, detail in results:
+        if status == "failed":
+            failed += 1
+            logging.error(f"Failed to process image {rel}: {detail}")
+            continue
+        skipped += status == "unchanged"
+        mtime, size = stats_by_rel[rel]
+        manifest[rel] = {"mtime": mtime, "size": size, "hash": detail, "options": options}
+
+    os.makedirs(output_dir, exist_ok=True)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+
+    seconds = time.perf_counter() - start
+    stats = {
+        "images": len(paths),
+        "processed": len(paths) - skipped - failed,
+        "skipped": skipped,
+        "failed": failed,
+        "seconds": round(seconds, 4),
+        "images_per_second": round(len(paths) / seconds, 1) if seconds else 0,
+    }
+    logging.info(f"process_images {source}: {stats}")
+    count("rows", len(paths))
+    return stats
@@ -0,0 +1,135 @@
+# app/jobs.py
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException
+
+from app.config import JOB_HISTORY, JOB_POOLS, JOB_QUEUE_DEPTH
+
+# Keywords that send a task to a dedicated pool; anything else runs on "default".
+# Model work is serialized on its own pool so encodes don't starve file tasks.
+POOL_KEYWORDS = {
+    "model": ("embedding", "similar", "comments", "transcribe", "audio"),
+    "subprocess": ("datagen", "prettier", "format markdown", "clone", "commit"),
+}
+
+
+def parse_pools(spec: str) -> Dict[str, int]:
+    """Parses "default:4,model:1" into {"default": 4, "model": 1}."""
+    pools = {}
+    for item in spec.split(","):
+        name, _, workers = item.strip().partition(":")
+        if name:
+            pools[name] = max(int(workers or 1), 1)
+    pools.setdefault("default", 4)
+    return pools
+
+
+def pool_for(task: str) -> str:
+    task_lower = task.lower()
+    for pool, keywords in POOL_KEYWORDS.items():
+        if any(keyword in task_lower for keyword in keywords):
+            return pool
+    return "default"
+
+
+class JobQueue:
+    """
+    Runs tasks on bounded per-type thread pools and keeps their results
+
+    Threads (not processes) are used so workers share the loaded models;
+    encoding, transcription and subprocess calls release the GIL.
+    """
+
+    def __init__(self, pools: Dict[str, int], max_depth: int = JOB_QUEUE_DEPTH, history: int = JOB_HISTORY):
+        self.pool_sizes = pools
+        self.max_depth = max_depth
+        self.history = history
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def _executor(self, pool: str) -> ThreadPoolExecutor:
+        if pool not in self.pool_sizes:
+            pool = "default"
+        if pool not in self._executors:
+            self._executors[pool] = ThreadPoolExecutor(max_workers=self.pool_sizes[pool], thread_name_prefix=f"job-{pool}")
+        return self._executors[pool]
+
+    def submit(self, task: str, func: Callable[[], Any], pool: Optional[str] = None) -> Tuple[Dict[str, Any], Future]:
+        """Queues func and returns its job record and future; raises 429 when the queue is full."""
+        pool = pool or pool_for(task)
+        with self._lock:
+            if self._active >= self.max_depth:
+                raise HTTPException(status_code=429, detail=f"Job queue is full ({self.max_depth} jobs)")
+            self._active += 1
+            job_id = uuid.uuid4().hex
+            job = {
+                "id": job_id,
+                "task": task,
+                "pool": pool,
+                "status": "queued",
+                "submitted_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "result": None,
+                "error": None,
+            }
+            self._jobs[job_id] = job
+            future = self._executor(pool).submit(self._run, job, func)
+        return dict(job), future
+
+    def _run(self, job: Dict[str, Any], func: Callable[[], Any]):
+        job["status"] = "running"
+        job["started_at"] = time.time()
+        try:
+            job["result"] = func()
+            job["status"] = "succeeded"
+            return job["result"]
+        except HTTPException as e:
+            job["status"] = "failed"
+            job["error"] = {"status_code": e.status_code, "detail": e.detail}
+            raise
+        except Exception as e:
+            logging.error(f"Job {job['id']} ({job['task']}) failed: {e}")
+            job["status"] = "failed"
+            job["error"] = {"status_code": _status_code(e), "detail": str(e)}
+            raise
+        finally:
+            job["finished_at"] = time.time()
+            with self._lock:
+                self._active -= 1
+                self._trim()
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job["finished_at"] is not None]
+        for job_id in finished[:max(len(finished) - self.history, 0)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._jobs.get(job_id)
+        return dict(job) if job is not None else None
+
+    def stats(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for job in list(self._jobs.values()):
+            counts[job["status"]] = counts.get(job["status"], 0) + 1
+        return {"active": self._active, "max_depth": self.max_depth, "pools": self.pool_sizes, "jobs": counts}
+
+
+def _status_code(e: Exception) -> int:
+    if isinstance(e, FileNotFoundError):
+        return 404
+    if isinstance(e, ValueError):
+        return 400
+    return 500
+
+
+# Shared process-wide queue
+job_queue = JobQueue(parse_pools(JOB_POOLS))
@@ -0,0 +1,125 @@
+# app/log_catalog.py
+import bisect
+import fnmatch
+import os
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from app.config import LOG_CATALOG_RESCAN
+
+HEAD_BYTES = 4096
+# Logs past the requested count that are re-stat'ed on every lookup as well
+RESTAT_EXTRA = 5
+
+
+def read_first_line(path: str, encoding: str = "utf-8") -> str:
+    """Reads a file's first line in HEAD_BYTES steps, without buffering the rest of the file."""
+    head = b""
+    with open(path, "rb") as f:
+        while b"\n" not in head:
+            chunk = f.read(HEAD_BYTES)
+            if not chunk:
+                break
+            head += chunk
+    return head.split(b"\n", 1)[0].decode(encoding, "replace").rstrip("\r")
+
+
+class LogCatalog:
+    """
+    Log files of one directory kept sorted by mtime, newest first
+
+    Lookups only re-list the directory when its mtime changed (a log was
+    created, removed or rotated). Appends don't change the directory mtime, so
+    most_recent(count) also re-stats the count + RESTAT_EXTRA newest logs on
+    every call. An append to an older log than those shows up once all files
+    are re-stat'ed, at most rescan_interval seconds later.
+    """
+
+    def __init__(self, log_dir: str, pattern: str = "*.log", rescan_interval: float = LOG_CATALOG_RESCAN):
+        self.log_dir = log_dir
+        self.pattern = pattern
+        self.rescan_interval = rescan_interval
+        self._mtimes: Dict[str, float] = {}
+        self._order: List[Tuple[float, str]] = []  # (-mtime, path), ascending = newest first
+        self._dir_mtime = None
+        self._last_full_scan = 0.0
+        self._lock = threading.Lock()
+
+    def _insert(self, path: str, mtime: float):
+        self._mtimes[path] = mtime
+        bisect.insort(self._order, (-mtime, path))
+
+    def _remove(self, path: str):
+        mtime = self._mtimes.pop(path)
+        index = bisect.bisect_left(self._order, (-mtime, path))
+        del self._order[index]
+
+    def refresh(self, force: bool = False):
+        """Brings the index up to date, touching only files that appeared, vanished or changed."""
+        with self._lock:
+            try:
+                dir_mtime = os.stat(self.log_dir).st_mtime_ns
+            except FileNotFoundError:
+                self._mtimes.clear()
+                self._order.clear()
+                self._dir_mtime = None
+                return
+
+            full = force or time.monotonic() - self._last_full_scan >= self.rescan_interval
+            if dir_mtime == self._dir_mtime and not full:
+                return
+
+            seen = set()
+            with os.scandir(self.log_dir) as entries:
+                for entry in entries:
+                    if not fnmatch.fnmatch(entry.name, self.pattern) or not entry.is_file():
+                        continue
+                    seen.add(entry.path)
+                    known = self._mtimes.get(entry.path)
+                    if known is not None and not full:
+                        continue
+                    mtime = entry.stat().st_mtime
+                    if known != mtime:
+                        if known is not None:
+                            self._remove(entry.path)
+                        self._insert(entry.path, mtime)
+
+            for path in [path for path in self._mtimes if path not in seen]:
+                self._remove(path)
+
+            self._dir_mtime = dir_mtime
+            if full:
+                self._last_full_scan = time.monotonic()
+
+    def most_recent(self, count: int = 1) -> List[str]:
+        """Paths of the count most recently modified logs, newest first."""
+        self.refresh()
+        with self._lock:
+            for _, path in self._order[:count + RESTAT_EXTRA]:
+                try:
+                    mtime = os.stat(path).st_mtime
+                except FileNotFoundError:
+                    self._remove(path)
+                    continue
+                if mtime != self._mtimes[path]:
+                    self._remove(path)
+                    self._insert(path, mtime)
+            return [path for _, path in self._order[:count]]
+
+    def first_lines(self, count: int = 1) -> List[Tuple[str, str]]:
+        """(path, first line) of the count most recent logs."""
+        return [(path, read_first_line(path)) for path in self.most_recent(count)]
+
+
+_catalogs: Dict[Tuple[str, str], LogCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(log_dir: str, pattern: str = "*.log") -> LogCatalog:
+    """Shared catalog per (directory, pattern), so the index survives between requests."""
+    key = (os.path.abspath(log_dir), pattern)
+    with _catalogs_lock:
+        if key not in _catalogs:
+            _catalogs[key] = LogCatalog(log_dir, pattern)
+        return _catalogs[key]
@@ -0,0 +1,115 @@
+# app/log_scanner.py
+import logging
+import mmap
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from app.config import LOG_MMAP_THRESHOLD, LOG_SCAN_WORKERS
+from app.metrics import count
+from app.streaming import BOMS, read_lines, sniff_encoding
+
+# Below this many files a process pool costs more than it saves
+MIN_PARALLEL_FILES = 8
+# Encodings whose newlines and ASCII severity words can be matched on raw bytes
+BYTE_SAFE_ENCODINGS = {"utf-8", "utf-8-sig"}
+
+
+def _line_pattern(severity: str) -> "re.Pattern[bytes]":
+    return re.compile(rb"^[^\n]*(?:" + severity.encode("utf-8") + rb")[^\n]*", re.MULTILINE)
+
+
+def scan_file(path: str, severity: str = "ERROR", mmap_threshold: int = LOG_MMAP_THRESHOLD) -> List[str]:
+    """
+    Returns the stripped lines of a log file matching the severity regex
+
+    The encoding is sniffed once from the first bytes. UTF-8 files are searched
+    as raw bytes (memory-mapped when large), so only matching lines are decoded.
+    """
+    encoding = sniff_encoding(path)
+    if encoding not in BYTE_SAFE_ENCODINGS:
+        compiled = re.compile(severity)
+        return [line.strip() for line in read_lines(path, encoding, errors="replace") if compiled.search(line)]
+
+    pattern = _line_pattern(severity)
+    start = len(BOMS[0][0]) if encoding == "utf-8-sig" else 0
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return []
+        if size >= mmap_threshold:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                return [m.group().decode("utf-8", "replace").strip() for m in pattern.finditer(buffer, start)]
+        buffer = f.read()
+    return [m.group().decode("utf-8", "replace").strip() for m in pattern.finditer(buffer, start)]
+
+
+def _scan(args):
+    return scan_file(*args)
+
+
+def scan_logs(log_dir: str, output_file: str, severity: str = "ERROR", workers: Optional[int] = None,
+              suffix: str = "") -> Dict[str, float]:
+    """
+    Scans every file in log_dir and writes the matching lines to output_file
+
+    Files are processed on a process pool and merged in sorted filename order,
+    so the output doesn't depend on which worker finishes first.
+
+    Args:
+        log_dir: Directory holding the (rotated) logs
+        output_file: Destination, not created when nothing matches
+        severity: Regex matched against each line, e.g. "ERROR|CRITICAL"
+        workers: Pool size, defaults to LOG_SCAN_WORKERS or the CPU count
+        suffix: Only scan files ending with this, e.g. ".log"
+
+    Returns:
+        Files scanned, matching lines, elapsed seconds and files/sec
+    """
+    re.compile(severity)  # Fail fast on an invalid pattern, before any worker starts
+    paths = sorted(
+        os.path.join(log_dir, name) for name in os.listdir(log_dir)
+        if name.endswith(suffix) and os.path.isfile(os.path.join(log_dir, name))
+    )
+    workers = workers or LOG_SCAN_WORKERS or os.cpu_count() or 1
+    jobs = [(path, severity) for path in paths]
+
+    start = time.perf_counter()
+    matches = 0
+    out = None
+    parallel = workers > 1 and len(paths) >= MIN_PARALLEL_FILES
+    # spawn, not fork: scans start on request threads of the multi-threaded server
+    executor = (ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+                if parallel else None)
+    try:
+        if executor is not None:
+            results = executor.map(_scan, jobs, chunksize=max(len(jobs) // (workers * 4), 1))
+        else:
+            results = map(_scan, jobs)
+
+        for lines in results:
+            if lines and out is None:
+                out = open(output_file, "w", encoding="utf-8")
+            for line in lines:
+                out.write(("\n" if matches else "") + line)
+                matches += 1
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        if out is not None:
+            out.close()
+
+    seconds = time.perf_counter() - start
+    stats = {
+        "files": len(paths),
+        "matches": matches,
+        "seconds": round(seconds, 4),
+        "files_per_second": round(len(paths) / seconds) if seconds else 0,
+    }
+    logging.info(f"scan_logs {log_dir}: {stats['files']} files, {matches} matches, {stats['files_per_second']} files/sec")
+    count("rows", matches)
+    count("bytes_read", sum(os.path.getsize(path) for path in paths))
+    return stats
@@ -0,0 +1,149 @@
+# app/markdown_render.py
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Sequence, Tuple
+
+from app.config import MARKDOWN_EXTENSIONS, MARKDOWN_WORKERS
+from app.metrics import count
+
+MANIFEST_NAME = ".markdown-manifest.json"
+MARKDOWN_SUFFIXES = (".md", ".markdown")
+# Below this many files a process pool costs more than it saves
+MIN_PARALLEL_FILES = 16
+
+# One renderer per thread (Markdown instances are not thread-safe), reset between documents instead of rebuilt
+_local = threading.local()
+
+
+def get_renderer(extensions: Sequence[str] = MARKDOWN_EXTENSIONS):
+    """This thread's markdown.Markdown instance for these extensions."""
+    import markdown
+
+    renderers = _local.__dict__.setdefault("renderers", {})
+    key = tuple(extensions)
+    if key not in renderers:
+        renderers[key] = markdown.Markdown(extensions=list(extensions))
+    return renderers[key]
+
+
+def render(text: str, extensions: Sequence[str] = MARKDOWN_EXTENSIONS) -> str:
+    renderer = get_renderer(extensions)
+    try:
+        return renderer.convert(text)
+    finally:
+        renderer.reset()
+
+
+def render_file(input_path: str, output_path: str, extensions: Sequence[str] = MARKDOWN_EXTENSIONS):
+    with open(input_path, "r", encoding="utf-8") as f:
+        html = render(f.read(), extensions)
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(html)
+
+
+def _render(args) -> Tuple[str, float, Optional[str]]:
+    """Worker: returns (rel, ms, error message or None)."""
+    rel, input_path, output_path, extensions = args
+    start = time.perf_counter()
+    try:
+        render_file(input_path, output_path, extensions)
+        error = None
+    except Exception as e:
+        error = str(e)
+    return rel, round((time.perf_counter() - start) * 1000, 3), error
+
+
+def render_tree(source_dir: str, output_dir: str, extensions: Sequence[str] = MARKDOWN_EXTENSIONS,
+                workers: Optional[int] = None, force: bool = False) -> Dict[str, object]:
+    """
+    Renders every Markdown file under source_dir to HTML in output_dir
+
+    Outputs keep their relative path with a .html suffix. The sha1 of each
+    source is kept in output_dir/.markdown-manifest.json together with the
+    extensions used, so files whose source is unchanged are skipped.
+
+    Args:
+        source_dir: Directory walked recursively for .md / .markdown files
+        output_dir: Destination directory
+        extensions: Python-Markdown extensions, defaults to MARKDOWN_EXTENSIONS
+        workers: Process pool size, defaults to MARKDOWN_WORKERS or the CPU count
+        force: Re-render everything
+
+    Returns:
+        File counts (rendered, skipped, failed), elapsed seconds, files/sec and
+        per-file render times in ms for the files rendered in this run
+    """
+    start = time.perf_counter()
+    if not os.path.isdir(source_dir):
+        raise FileNotFoundError(f"Markdown directory not found: {source_dir}")
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        previous = {}
+
+    paths = sorted(
+        os.path.join(dirpath, name)
+        for dirpath, _, names in os.walk(source_dir) for name in names
+        if name.lower().endswith(MARKDOWN_SUFFIXES)
+    )
+    options = list(extensions)
+    manifest, jobs, hashes = {}, [], {}
+    for path in paths:
+        rel = os.path.relpath(path, source_dir).replace(os.sep, "/")
+        output_path = os.path.join(output_dir, os.path.splitext(rel)[0] + ".html")
+        digest = hashlib.sha1()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        digest = digest.hexdigest()
+        entry = previous.get(rel)
+        if not force and entry == {"hash": digest, "options": options} and os.path.exists(output_path):
+            manifest[rel] = entry
+            continue
+        hashes[rel] = digest
+        jobs.append((rel, path, output_path, tuple(extensions)))
+
+    workers = workers or MARKDOWN_WORKERS or os.cpu_count() or 1
+    if workers > 1 and len(jobs) >= MIN_PARALLEL_FILES:
+        # spawn, not fork: this runs on a request thread of the multi-threaded server
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            results = list(executor.map(_render, jobs, chunksize=max(len(jobs) // (workers * 4), 1)))
+    else:
+        results = [_render(job) for job in jobs]
+
+    timings, failed = {}, 0
+    for rel, ms, error in results:
+        if error is not None:
+            failed += 1
+            logging.error(f"Failed to render {rel}: {error}")
+            continue
+        timings[rel] = ms
+        manifest[rel] = {"hash": hashes[rel], "options": options}
+
+    os.makedirs(output_dir, exist_ok=True)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+
+    seconds = time.perf_counter() - start
+    stats = {
+        "files": len(paths),
+        "rendered": len(timings),
+        "skipped": len(paths) - len(jobs),
+        "failed": failed,
+        "seconds": round(seconds, 4),
+        "files_per_second": round(len(paths) / seconds, 1) if seconds else 0,
+        "slowest_ms": max(timings.values(), default=0),
+        "file_ms": timings,
+    }
+    logging.info(f"render_tree {source_dir}: " + str({k: v for k, v in stats.items() if k != "file_ms"}))
+    count("rows", len(paths))
+    return stats
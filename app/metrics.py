@@ -0,0 +1,235 @@
+# app/metrics.py
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.config import METRICS_ENABLED
+
+PREFIX = "dataworks_"
+
+_SECONDS = [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300]
+_BYTES = [1 << n for n in range(10, 32, 2)]  # 1 KB .. 1 GB, x4
+_ROWS = [10 ** n for n in range(0, 8)]
+
+# name: (help text, bucket upper bounds)
+HISTOGRAMS = {
+    "task_wall_seconds": ("Wall time per task run", _SECONDS),
+    "task_cpu_seconds": ("CPU time of the thread running the task", _SECONDS),
+    "task_bytes_read": ("Bytes read from files and the network per task run", _BYTES),
+    "task_bytes_written": ("Bytes written to files or responses per task run", _BYTES),
+    "task_rows": ("Rows, records or lines processed per task run", _ROWS),
+    "task_model_encode_seconds": ("Time spent in model encode calls per task run", _SECONDS),
+}
+# Counters recorded by count() inside a measured task, and the histogram each one feeds
+COUNTERS = {
+    "bytes_read": "task_bytes_read",
+    "bytes_written": "task_bytes_written",
+    "rows": "task_rows",
+    "model_encode_seconds": "task_model_encode_seconds",
+}
+
+_current: ContextVar[Optional[Dict[str, float]]] = ContextVar("task_metrics", default=None)
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: List[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    Histograms keyed by metric name and labels, rendered as Prometheus text
+
+    Observations happen once per task run (not per row or chunk), so a
+    single lock is enough.
+    """
+
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Histogram] = {}
+        self._errors: Dict[Tuple[Tuple[str, str], ...], int] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, labels: Dict[str, str], value: float):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(HISTOGRAMS[name][1])
+            histogram.observe(value)
+
+    def error(self, labels: Dict[str, str]):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._errors[key] = self._errors.get(key, 0) + 1
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            snapshots = [(key, list(h.counts), h.sum, h.count) for key, h in histograms]
+            errors = sorted(self._errors.items())
+
+        lines = []
+        previous = None
+        for (name, labels), counts, total, count in snapshots:
+            metric = PREFIX + name
+            if name != previous:
+                lines.append(f"# HELP {metric} {HISTOGRAMS[name][0]}")
+                lines.append(f"# TYPE {metric} histogram")
+                previous = name
+            cumulative = 0
+            for bound, bucket in zip(HISTOGRAMS[name][1] + [float("inf")], counts):
+                cumulative += bucket
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                lines.append(f"{metric}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{metric}_sum{_labels(labels)} {total!r}")
+            lines.append(f"{metric}_count{_labels(labels)} {count}")
+        if errors:
+            lines.append(f"# HELP {PREFIX}task_errors_total Task runs that raised")
+            lines.append(f"# TYPE {PREFIX}task_errors_total counter")
+            for labels, count in errors:
+                lines.append(f"{PREFIX}task_errors_total{_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels: Iterable[Tuple[str, str]]) -> str:
+    pairs = [f'{name}="' + str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') + '"'
+             for name, value in labels]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+registry = MetricsRegistry()
+
+
+def count(name: str, value: float):
+    """
+    Adds value to a counter of the task running in this context
+
+    A no-op outside measure() (and so whenever metrics are disabled); hot
+    paths should call it once per batch or chunk, not per row.
+    """
+    counters = _current.get()
+    if counters is not None:
+        counters[name] = counters.get(name, 0) + value
+
+
+def _record(labels: Dict[str, str], counters: Dict[str, float], wall: float, cpu: Optional[float], failed: bool):
+    registry.observe("task_wall_seconds", labels, wall)
+    if cpu is not None:
+        registry.observe("task_cpu_seconds", labels, cpu)
+    for name, value in counters.items():
+        registry.observe(COUNTERS[name], labels, value)
+    if failed:
+        registry.error(labels)
+
+
+@contextmanager
+def measure(task: str, **labels: str):
+    """Records wall/CPU time and the count() totals of the enclosed block under task."""
+    if not METRICS_ENABLED:
+        yield
+        return
+    labels = dict(labels, task=task)
+    counters: Dict[str, float] = {}
+    token = _current.set(counters)
+    wall, cpu = time.perf_counter(), time.thread_time()
+    failed = True
+    try:
+        yield
+        failed = False
+    finally:
+        _current.reset(token)
+        _record(labels, counters, time.perf_counter() - wall, time.thread_time() - cpu, failed)
+
+
+class MeteredStream:
+    """
+    Measures a streamed response body from creation until it is exhausted or closed
+
+    Each chunk is produced under the stream's own counters, because response
+    iterators are advanced on pool threads in fresh contexts; CPU time is the
+    sum over those steps and bytes_written the bytes handed to the server.
+    The run is recorded once: when the chunks run out or raise, or on close()
+    (also called on garbage collection) if the client went away first, even
+    before the first chunk was asked for.
+    """
+
+    def __init__(self, chunks: Iterable[bytes], task: str, **labels: str):
+        self._done = True  # until fully set up, so __del__ has nothing to record
+        self._chunks = iter(chunks)
+        self._labels = dict(labels, task=task)
+        self._counters: Dict[str, float] = {"bytes_written": 0}
+        self._wall, self._cpu = time.perf_counter(), 0.0
+        self._done = False
+
+    def __iter__(self) -> "MeteredStream":
+        return self
+
+    def __next__(self) -> bytes:
+        token = _current.set(self._counters)
+        step = time.thread_time()
+        failed = None
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            failed = False
+            raise
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self._cpu += time.thread_time() - step
+            _current.reset(token)
+            if failed is not None:
+                self._finish(failed)
+        self._counters["bytes_written"] += len(chunk)
+        return chunk
+
+    def _finish(self, failed: bool):
+        if not self._done:
+            self._done = True
+            _record(self._labels, self._counters, time.perf_counter() - self._wall, self._cpu, failed)
+
+    def close(self):
+        """The client went away or the response is done; what was sent is recorded, not as an error."""
+        if self._done:
+            return
+        self._finish(failed=False)
+        close = getattr(self._chunks, "close", None)
+        if close is not None:
+            close()
+
+    def __del__(self):
+        self.close()
+
+
+def metered(chunks: Iterable[bytes], task: str, **labels: str) -> Iterator[bytes]:
+    """Wraps a streamed response body in a MeteredStream; either way the result has close()."""
+    if not METRICS_ENABLED:
+        return (chunk for chunk in chunks)
+    return MeteredStream(chunks, task, **labels)
+
+
+def record_sent(task: str, started: float, bytes_written: Optional[int] = None, **labels: str):
+    """
+    Records a body the server sends itself (FileResponse), from a BackgroundTask run after the send
+
+    Wall time runs from started (time.perf_counter()) to now. No CPU time is
+    recorded: the send happens in the server and kernel, not in our thread.
+    """
+    if METRICS_ENABLED:
+        counters = {} if bytes_written is None else {"bytes_written": bytes_written}
+        _record(dict(labels, task=task), counters, time.perf_counter() - started, None, False)
@@ -1,8 +1,113 @@
-from sentence_transformers import SentenceTransformer
-from typing import List
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List
+
+from app.config import EMBEDDING_MODEL, WHISPER_MODEL
+
+# Process-wide model registry: every model is loaded at most once per worker
+_models: Dict[str, Any] = {}
+_model_stats: Dict[str, Dict[str, float]] = {}
+_lock = threading.Lock()
+
+
+def _load_sentence_transformer(name: str):
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(name)
+
+
+def _load_whisper(name: str):
+    import whisper
+    return whisper.load_model(name)
+
+
+MODEL_LOADERS = {
+    "sentence-transformers": _load_sentence_transformer,
+    "whisper": _load_whisper,
+}
+
+
+def _resident_memory() -> int:
+    """Resident set size of the current process in bytes (0 if unknown)."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except ImportError:
+        return 0
+
+
+def get_model(kind: str, name: str):
+    """
+    Return a loaded model, loading it on first use
+
+    Args:
+        kind: Loader to use, one of MODEL_LOADERS
+        name: Model name passed to the loader
+
+    Returns:
+        The shared model instance
+    """
+    key = f"{kind}:{name}"
+    model = _models.get(key)
+    if model is not None:
+        return model
+
+    if kind not in MODEL_LOADERS:
+        raise ValueError(f"Unknown model kind: {kind}")
+
+    with _lock:
+        # Another thread may have finished loading while we waited
+        if key in _models:
+            return _models[key]
+
+        rss_before = _resident_memory()
+        start = time.perf_counter()
+        model = MODEL_LOADERS[kind](name)
+        load_seconds = time.perf_counter() - start
+        rss_bytes = max(_resident_memory() - rss_before, 0)
+
+        _models[key] = model
+        _model_stats[key] = {"load_seconds": round(load_seconds, 3), "rss_bytes": rss_bytes}
+        logging.info(f"Loaded model {key} in {load_seconds:.2f}s (+{rss_bytes / 2**20:.1f} MB RSS)")
+        return model
+
+
+def get_embedding_model(name: str = EMBEDDING_MODEL):
+    """Shared SentenceTransformer instance."""
+    return get_model("sentence-transformers", name)
+
+
+def get_whisper_model(name: str = WHISPER_MODEL):
+    """Shared Whisper instance."""
+    return get_model("whisper", name)
+
+
+def warm_up(specs: List[str]) -> Dict[str, Dict[str, float]]:
+    """
+    Load models ahead of the first request
+
+    Args:
+        specs: List of "kind:name" strings, e.g. "whisper:base"
+
+    Returns:
+        Load statistics for every loaded model
+    """
+    for spec in specs:
+        kind, _, name = spec.partition(":")
+        get_model(kind, name)
+    return model_stats()
+
+
+def model_stats() -> Dict[str, Dict[str, float]]:
+    """Load time and resident memory delta for every loaded model."""
+    return {key: dict(stats) for key, stats in _model_stats.items()}
 
-# Initialize the embedding model
-model = SentenceTransformer("all-MiniLM-L6-v2")
 
 def generate_embeddings(sentences: List[str]) -> List[List[float]]:
     """
@@ -15,7 +120,7 @@ def generate_embeddings(sentences: List[str]) -> List[List[float]]:
         List of embeddings as float arrays
     """
     try:
-        embeddings = model.encode(sentences)
+        embeddings = get_embedding_model().encode(sentences)
         return embeddings.tolist()
     except Exception as e:
-        raise ValueError(f"Error generating embeddings: {str(e)}")
\ No newline at end of file
+        raise ValueError(f"Error generating embeddings: {str(e)}")
@@ -0,0 +1,48 @@
+// app/prettier_worker.js
+//
+// Long-lived Prettier formatter driven by app/formatter.py. One JSON request
+// per stdin line, one JSON response per stdout line:
+//   request:  {"id": 1, "filepath": "data/format.md", "content": "..."}
+//   response: {"id": 1, "formatted": "...", "ms": 3.2} or {"id": 1, "error": "..."}
+// The first line written is {"ready": true, "version": "<prettier version>"}.
+const path = require("path");
+const readline = require("readline");
+const { createRequire } = require("module");
+
+// Resolve prettier from the working directory's node_modules, else from NODE_PATH
+// (formatter.py points it at the global install)
+function loadPrettier() {
+  try {
+    return createRequire(path.join(process.cwd(), "index.js"))("prettier");
+  } catch (e) {
+    return require("prettier");
+  }
+}
+const prettier = loadPrettier();
+
+async function handle(request) {
+  const start = process.hrtime.bigint();
+  try {
+    const options = (await prettier.resolveConfig(request.filepath)) || {};
+    const formatted = await prettier.format(request.content, { ...options, filepath: request.filepath });
+    return { id: request.id, formatted, ms: Number(process.hrtime.bigint() - start) / 1e6 };
+  } catch (e) {
+    return { id: request.id, error: String((e && e.message) || e) };
+  }
+}
+
+const lines = readline.createInterface({ input: process.stdin, crlfDelay: Infinity });
+lines.on("line", async (line) => {
+  if (!line.trim()) return;
+  let request;
+  try {
+    request = JSON.parse(line);
+  } catch (e) {
+    process.stdout.write(JSON.stringify({ id: null, error: `Invalid request: ${e.message}` }) + "\n");
+    return;
+  }
+  const response = await handle(request);
+  process.stdout.write(JSON.stringify(response) + "\n");
+});
+
+process.stdout.write(JSON.stringify({ ready: true, version: prettier.version }) + "\n");
@@ -0,0 +1,156 @@
+# app/similarity.py
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# Rows/columns per tile. A tile holds BLOCK_SIZE**2 float32 scores (16 MB at 2048),
+# so memory stays bounded no matter how many comments are compared.
+BLOCK_SIZE = 2048
+
+
+def normalize(embeddings) -> np.ndarray:
+    """Returns float32, L2-normalized rows so a dot product is the cosine similarity."""
+    vectors = _as_matrix(embeddings)
+    return _normalized_block(vectors, _inverse_norms(vectors), 0, len(vectors))
+
+
+def _as_matrix(embeddings) -> np.ndarray:
+    # Memory-mapped / float16 matrices are kept as-is and converted one block at a time
+    vectors = embeddings if isinstance(embeddings, np.ndarray) else np.asarray(embeddings, dtype=np.float32)
+    if vectors.ndim != 2:
+        raise ValueError(f"Expected a 2D embedding matrix, got shape {vectors.shape}")
+    return vectors
+
+
+def _inverse_norms(vectors: np.ndarray, block_size: int = BLOCK_SIZE) -> np.ndarray:
+    inv_norms = np.empty(len(vectors), dtype=np.float32)
+    for start in range(0, len(vectors), block_size):
+        block = np.asarray(vectors[start:start + block_size], dtype=np.float32)
+        norms = np.linalg.norm(block, axis=1)
+        norms[norms == 0] = 1.0  # Zero vectors keep a similarity of 0 to everything
+        inv_norms[start:start + block_size] = 1.0 / norms
+    return inv_norms
+
+
+def _normalized_block(vectors: np.ndarray, inv_norms: np.ndarray, start: int, stop: int) -> np.ndarray:
+    return np.asarray(vectors[start:stop], dtype=np.float32) * inv_norms[start:stop, None]
+
+
+def iter_tiles(embeddings, block_size: int = BLOCK_SIZE,
+               upper_only: bool = True) -> Iterator[Tuple[int, int, np.ndarray]]:
+    """
+    Yields (row_start, col_start, scores) tiles of the cosine similarity matrix
+
+    Rows are normalized per tile, so a memory-mapped matrix is never copied whole.
+
+    Args:
+        embeddings: (n, dim) matrix, ndarray or np.memmap
+        block_size: Rows and columns per tile
+        upper_only: Skip tiles strictly below the diagonal (pairwise searches)
+    """
+    vectors = _as_matrix(embeddings)
+    inv_norms = _inverse_norms(vectors, block_size)
+    n = len(vectors)
+    for row_start in range(0, n, block_size):
+        rows = _normalized_block(vectors, inv_norms, row_start, row_start + block_size)
+        first_col = row_start if upper_only else 0
+        for col_start in range(first_col, n, block_size):
+            cols = _normalized_block(vectors, inv_norms, col_start, col_start + block_size)
+            yield row_start, col_start, rows @ cols.T
+
+
+def _mask_diagonal(scores: np.ndarray, row_start: int, col_start: int, upper_only: bool):
+    """Blanks self-similarities (and the lower triangle for pairwise searches) in place."""
+    if row_start != col_start:
+        return
+    if upper_only:
+        scores[np.tril_indices(scores.shape[0], m=scores.shape[1])] = -np.inf
+    else:
+        np.fill_diagonal(scores, -np.inf)
+
+
+def best_pair(embeddings, block_size: int = BLOCK_SIZE) -> Optional[Tuple[int, int, float]]:
+    """
+    Finds the most similar pair of rows
+
+    Returns:
+        (i, j, score) with i < j, or None when there are fewer than two rows
+    """
+    if len(embeddings) < 2:
+        return None
+
+    best = None
+    for row_start, col_start, scores in iter_tiles(embeddings, block_size):
+        _mask_diagonal(scores, row_start, col_start, upper_only=True)
+        flat = int(np.argmax(scores))
+        i, j = divmod(flat, scores.shape[1])
+        score = float(scores[i, j])
+        if best is None or score > best[2]:
+            best = (row_start + i, col_start + j, score)
+    return best
+
+
+def pairs_above_threshold(embeddings, threshold: float,
+                          block_size: int = BLOCK_SIZE) -> List[Tuple[int, int, float]]:
+    """
+    Finds every pair of rows whose cosine similarity is above threshold
+
+    Returns:
+        List of (i, j, score) with i < j, most similar first
+    """
+    pairs = []
+    for row_start, col_start, scores in iter_tiles(embeddings, block_size):
+        _mask_diagonal(scores, row_start, col_start, upper_only=True)
+        rows, cols = np.nonzero(scores > threshold)
+        pairs.extend(zip((rows + row_start).tolist(), (cols + col_start).tolist(),
+                         scores[rows, cols].tolist()))
+    pairs.sort(key=lambda pair: pair[2], reverse=True)
+    return pairs
+
+
+def top_k_neighbours(embeddings, k: int = 5,
+                     block_size: int = BLOCK_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Finds the k most similar other rows for every row
+
+    Returns:
+        (indices, scores) arrays of shape (n, k), best match first.
+        Rows with fewer than k neighbours are padded with -1 / -inf.
+    """
+    n = len(embeddings)
+    indices = np.full((n, k), -1, dtype=np.int64)
+    scores = np.full((n, k), -np.inf, dtype=np.float32)
+    if n == 0 or k <= 0:
+        return indices, scores
+
+    def store(row_start, best_idx, best_scores):
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_idx = np.take_along_axis(best_idx, order, axis=1)
+        best_idx[np.isneginf(best_scores)] = -1
+        indices[row_start:row_start + len(best_idx)] = best_idx
+        scores[row_start:row_start + len(best_idx)] = best_scores
+
+    current_row = None
+    best_idx = best_scores = None
+    # Tiles arrive row block by row block, each spanning every column block
+    for row_start, col_start, tile in iter_tiles(embeddings, block_size, upper_only=False):
+        if row_start != current_row:
+            if current_row is not None:
+                store(current_row, best_idx, best_scores)
+            current_row = row_start
+            best_idx = np.full((tile.shape[0], k), -1, dtype=np.int64)
+            best_scores = np.full((tile.shape[0], k), -np.inf, dtype=np.float32)
+
+        _mask_diagonal(tile, row_start, col_start, upper_only=False)
+        tile_idx = np.broadcast_to(np.arange(col_start, col_start + tile.shape[1]), tile.shape)
+
+        # Merge the running top-k with this tile and keep the k best per row
+        merged_scores = np.concatenate([best_scores, tile], axis=1)
+        merged_idx = np.concatenate([best_idx, tile_idx], axis=1)
+        keep = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(merged_scores, keep, axis=1)
+        best_idx = np.take_along_axis(merged_idx, keep, axis=1)
+
+    store(current_row, best_idx, best_scores)
+    return indices, scores
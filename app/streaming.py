@@ -0,0 +1,180 @@
+# app/streaming.py
+import codecs
+import json
+import logging
+import os
+import re
+import time
+from typing import Callable, Dict, Iterable, Iterator, Union
+
+from app.metrics import count
+
+CHUNK_SIZE = 1 << 20  # 1 MB reads
+SNIFF_SIZE = 1 << 16
+
+BOMS = [
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+Stage = Callable[[Iterator[str]], Iterator[str]]
+
+
+def read_lines(path: str, encoding: str = "utf-8", chunk_size: int = CHUNK_SIZE, errors: str = "strict") -> Iterator[str]:
+    """Yields lines (without line endings) from fixed-size chunks, so memory doesn't grow with the file."""
+    with open(path, "r", encoding=encoding, errors=errors, newline="") as f:
+        pending = ""
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            lines = (pending + chunk).split("\n")
+            pending = lines.pop()
+            for line in lines:
+                yield line.rstrip("\r")
+        if pending:
+            yield pending.rstrip("\r")
+
+
+def sniff_encoding(path: str, candidates=("utf-8", "utf-16")) -> str:
+    """Picks an encoding from the BOM, else the first candidate that decodes the first 64 KB."""
+    with open(path, "rb") as f:
+        sample = f.read(SNIFF_SIZE)
+    for bom, encoding in BOMS:
+        if sample.startswith(bom):
+            return encoding
+    for encoding in candidates:
+        try:
+            # Incremental decode tolerates a character cut in half at the sample boundary
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return candidates[0]
+
+
+def write_lines(path: str, lines: Iterable[str], separator: str = "\n", encoding: str = "utf-8") -> int:
+    """Writes lines as they arrive (no trailing separator) and returns how many were written."""
+    count = 0
+    with open(path, "w", encoding=encoding) as f:
+        for line in lines:
+            if count:
+                f.write(separator)
+            f.write(line)
+            count += 1
+    return count
+
+
+def grep(substring: str) -> Stage:
+    """Keeps lines containing substring."""
+    def stage(lines):
+        return (line for line in lines if substring in line)
+    return stage
+
+
+def findall(pattern: str, flags: int = 0) -> Stage:
+    """Emits every regex match in every line."""
+    compiled = re.compile(pattern, flags)
+
+    def stage(lines):
+        for line in lines:
+            yield from compiled.findall(line)
+    return stage
+
+
+def strip(lines: Iterator[str]) -> Iterator[str]:
+    return (line.strip() for line in lines)
+
+
+def unique(lines: Iterator[str]) -> Iterator[str]:
+    """Drops repeats, keeping first-seen order. Memory grows with distinct values only."""
+    seen = set()
+    for line in lines:
+        if line not in seen:
+            seen.add(line)
+            yield line
+
+
+def run_pipeline(name: str, input_paths, output_path: str, *stages: Stage,
+                 encoding: Union[str, Callable[[str], str]] = "utf-8") -> Dict[str, float]:
+    """
+    Streams lines from input_paths through stages into output_path
+
+    Args:
+        name: Label used in the throughput log line
+        input_paths: A path or list of paths read one after another
+        output_path: File the final stage's lines are written to
+        stages: Generator functions applied in order
+        encoding: Input encoding, or a function picking one per path (e.g. sniff_encoding)
+
+    Returns:
+        Line counts, elapsed seconds and lines/sec
+    """
+    if isinstance(input_paths, str):
+        input_paths = [input_paths]
+    stats = {"lines_in": 0}
+
+    def source():
+        for path in input_paths:
+            for line in read_lines(path, encoding(path) if callable(encoding) else encoding):
+                stats["lines_in"] += 1
+                yield line
+
+    start = time.perf_counter()
+    stream = source()
+    for stage in stages:
+        stream = stage(stream)
+    stats["lines_out"] = write_lines(output_path, stream)
+    stats["seconds"] = round(time.perf_counter() - start, 4)
+    stats["lines_per_second"] = round(stats["lines_in"] / stats["seconds"]) if stats["seconds"] else 0
+    logging.info(f"{name}: {stats['lines_in']} lines in, {stats['lines_out']} out, {stats['lines_per_second']} lines/sec")
+    count("rows", stats["lines_in"])
+    count("bytes_read", sum(os.path.getsize(path) for path in input_paths))
+    count("bytes_written", os.path.getsize(output_path))
+    return stats
+
+
+_SEPARATORS = re.compile(r"[\s,]*")
+
+
+def iter_json_records(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator:
+    """
+    Yields the elements of a top-level JSON array, or the objects of an NDJSON file
+
+    Elements are decoded one at a time from chunked reads, so the whole
+    document is never held in memory.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = f.read(chunk_size)
+        pos = _SEPARATORS.match(buffer).end()
+        if not buffer[pos:pos + 1] == "[":
+            for line in read_lines(path, chunk_size=chunk_size):
+                if line.strip():
+                    yield json.loads(line)
+            return
+        pos += 1
+        eof = False
+
+        while True:
+            pos = _SEPARATORS.match(buffer, pos).end()
+            if pos < len(buffer) and buffer[pos] == "]":
+                return
+            try:
+                record, end = decoder.raw_decode(buffer, pos)
+                # A value ending exactly at the buffer edge may continue in the next chunk
+                complete = end < len(buffer) or eof
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                complete = False
+            if complete:
+                yield record
+                pos = end
+                continue
+
+            more = f.read(chunk_size)
+            eof = not more
+            buffer = buffer[pos:] + more
+            pos = 0
@@ -0,0 +1,150 @@
+# app/task_registry.py
+import importlib
+import logging
+import re
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from fastapi import HTTPException
+
+from app.config import INTENT_EMBEDDINGS, INTENT_MIN_SIMILARITY, TASK_MIN_SCORE
+from app.metrics import measure
+from app.models import get_embedding_model
+
+STOPWORDS = {"a", "an", "and", "the", "of", "for", "from", "to", "in", "on", "my", "all", "please"}
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in re.findall(r"[a-z0-9]+", text.lower()) if token not in STOPWORDS]
+
+
+class TaskRegistry:
+    """
+    Maps task phrases to handlers, built once at import time
+
+    Lookups go through an inverted token index, so only phrases sharing a
+    keyword with the request are scored. When no phrase scores above
+    min_score and embeddings are enabled, the request is compared against
+    precomputed MiniLM vectors of every phrase instead.
+    """
+
+    def __init__(self, use_embeddings: bool = INTENT_EMBEDDINGS, min_score: float = TASK_MIN_SCORE,
+                 min_similarity: float = INTENT_MIN_SIMILARITY):
+        self.use_embeddings = use_embeddings
+        self.min_score = min_score
+        self.min_similarity = min_similarity
+        self._handlers: Dict[str, Callable[[], Any]] = {}
+        self._pools: Dict[str, str] = {}
+        self._tokens: Dict[str, Set[str]] = {}
+        self._index: Dict[str, List[str]] = defaultdict(list)
+        self._phrase_vectors: Optional[np.ndarray] = None
+
+    def register(self, phrase: str, handler: Callable[[], Any], pool: str = "default"):
+        key = phrase.lower().strip()
+        if key not in self._handlers:
+            for token in set(tokenize(key)):
+                self._index[token].append(key)
+        self._handlers[key] = handler
+        self._pools[key] = pool
+        self._tokens[key] = set(tokenize(key))
+        self._phrase_vectors = None
+
+    def phrases(self) -> List[str]:
+        return list(self._handlers)
+
+    def match(self, task: str, limit: int = 5) -> List[Tuple[str, float]]:
+        """
+        Ranks registered phrases against a request
+
+        Returns:
+            Up to limit (phrase, score) pairs, best first; scores are in [0, 1]
+        """
+        text = task.lower().strip()
+        if text in self._handlers:
+            return [(text, 1.0)]
+
+        query = set(tokenize(text))
+        candidates = {phrase for token in query for phrase in self._index.get(token, ())}
+        ranked = []
+        for phrase in candidates:
+            tokens = self._tokens[phrase]
+            score = len(tokens & query) / len(tokens | query)
+            # Substring hits are what the old linear scan accepted; keep them on top
+            if phrase in text or text in phrase:
+                score = 0.5 + score / 2
+            ranked.append((phrase, round(score, 4)))
+        # Ties go to the more specific (longer) phrase
+        ranked.sort(key=lambda item: (-item[1], -len(item[0]), item[0]))
+
+        if self.use_embeddings and (not ranked or ranked[0][1] < self.min_score):
+            ranked = self._match_embeddings(text) + ranked
+        return ranked[:limit]
+
+    def _ensure_vectors(self) -> np.ndarray:
+        if self._phrase_vectors is None:
+            vectors = np.asarray(get_embedding_model().encode(self.phrases()), dtype=np.float32)
+            self._phrase_vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        return self._phrase_vectors
+
+    def _match_embeddings(self, text: str) -> List[Tuple[str, float]]:
+        phrases = self.phrases()
+        phrase_vectors = self._ensure_vectors()
+        query = np.asarray(get_embedding_model().encode([text]), dtype=np.float32)[0]
+        scores = phrase_vectors @ (query / np.linalg.norm(query))
+        order = np.argsort(-scores)
+        return [(phrases[i], round(float(scores[i]), 4)) for i in order if scores[i] >= self.min_similarity]
+
+    def warm(self):
+        """Precomputes phrase vectors so the first fuzzy lookup doesn't pay for them."""
+        if self.use_embeddings:
+            self._ensure_vectors()
+
+    def resolve(self, task: str) -> Tuple[str, Callable[[], Any], str]:
+        """
+        Returns the best (phrase, handler, job pool) for a request or raises a 400
+
+        With embeddings enabled this may run a model encode, so async callers
+        should call it through run_in_threadpool.
+        """
+        ranked = self.match(task, limit=1)
+        if ranked and (ranked[0][1] >= self.min_score
+                       or (self.use_embeddings and ranked[0][1] >= self.min_similarity)):
+            phrase = ranked[0][0]
+            if phrase != task.lower().strip():
+                logging.info(f"Found similar task '{phrase}' for input '{task}' (score {ranked[0][1]})")
+            return phrase, self._handlers[phrase], self._pools[phrase]
+        logging.error(f"Unsupported task: {task}")
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported task. Available tasks are: {', '.join(self.phrases())}"
+        )
+
+    def run(self, phrase: str, handler: Callable[[], Any]):
+        """Runs a handler returned by resolve(), measured under its phrase."""
+        logging.info(f"Executing task: {phrase}")
+        with measure(phrase):
+            return handler()
+
+    def execute(self, task: str):
+        phrase, handler, _ = self.resolve(task)
+        return self.run(phrase, handler)
+
+
+def load_plugins(registry: TaskRegistry, modules: List[str]):
+    """
+    Imports each task plugin module and calls its register_tasks(registry)
+
+    Plugins are expected to import their heavy dependencies inside the task
+    functions, so loading them only costs the module itself. A plugin that
+    fails to import is logged and skipped rather than stopping the server.
+    """
+    for name in modules:
+        start = time.perf_counter()
+        try:
+            importlib.import_module(name).register_tasks(registry)
+        except Exception as e:
+            logging.error(f"Failed to load task plugin {name}: {e}")
+            continue
+        logging.info(f"Loaded task plugin {name} in {(time.perf_counter() - start) * 1000:.1f} ms")
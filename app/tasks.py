@@ -8,18 +8,26 @@ import numpy as np
 from pathlib import Path
 from typing import List
 from fastapi import HTTPException, APIRouter
-from sentence_transformers import SentenceTransformer
 import subprocess
 
 
-
-from tasks_phase_b import convert_markdown_to_html, fetch_api_data
-
-
  # Only import install_and_run from main
 # app/tasks.py
 # app/tasks.py
 from app.utils import extract_h1_index, find_similar_comments  # ✅ Fix circular import
+from app.embedding_cache import encode_cached
+from app.embedding_store import save_embeddings
+from app.config import EMBEDDING_DTYPE, EMBEDDINGS_PATH, SORT_MEMORY_BUDGET, TASK_PLUGINS
+from app.task_registry import TaskRegistry, load_plugins
+from app.dates import WEEKDAYS, parse_weekdays, weekday_filter
+from app.streaming import findall, run_pipeline
+from app.log_scanner import scan_file, scan_logs
+from app.log_catalog import get_catalog
+from app.external_sort import sort_json_file
+from app.docs_index import build_index
+from app.db import QueryTimeout, stream_query
+from app.ticket_aggregates import type_revenue
+from app.formatter import PrettierError, get_prettier_pool
 
 def execute_task(task):
     """Handles different tasks."""
@@ -32,9 +40,6 @@ def execute_task(task):
 
 
 
-# Initialize embedding model
-embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
-
 router = APIRouter()
 
 def count_weekday(input_path: str, output_path: str, weekday: int):
@@ -46,103 +51,88 @@ def count_weekday(input_path: str, output_path: str, weekday: int):
         if not os.path.exists(input_path):
             raise FileNotFoundError(f"Input file not found: {input_path}")
 
-        with open(input_path, 'r') as f:
-            lines = f.readlines()
-            logging.info(f"Dates: {lines}")
+        counts = np.zeros(7, dtype=np.int64)
+        stats = run_pipeline("count_weekday", input_path, output_path, weekday_filter(weekday, counts))
+        matched = stats["lines_out"]
+        logging.info(f"Weekday counts: {dict(zip(WEEKDAYS, counts.tolist()))}")
         
-        filtered_dates = [date.strip() for date in lines if is_valid_weekday(date.strip(), weekday)]
-        
-        with open(output_path, 'w') as out_file:
-            out_file.write("\n".join(filtered_dates))
-        
-        return f"Found {len(filtered_dates)} dates matching weekday {weekday} and saved to {output_path}"
+        return f"Found {matched} dates matching weekday {weekday} and saved to {output_path}"
     except Exception as e:
         logging.error(f"Error in counting weekdays: {e}")
         raise HTTPException(status_code=500, detail=f"Error in counting weekdays: {str(e)}")
 
 def is_valid_weekday(date_str, weekday):
-    try:
-        return datetime.datetime.strptime(date_str, "%Y-%m-%d").date().weekday() == weekday
-    except ValueError:
-        return False
+    return parse_weekdays([date_str])[0] == weekday
 
-def extract_error_logs(log_dir="data/logs", output_file="error_logs.txt"):
+def extract_error_logs(log_dir="data/logs", output_file="error_logs.txt", severity="ERROR"):
     if not os.path.exists(log_dir):
         raise FileNotFoundError(f"Log directory not found: {log_dir}")
     
-    error_logs = []
-    for log_file in os.listdir(log_dir):
-        log_path = os.path.join(log_dir, log_file)
-        error_logs.extend(read_log_errors(log_path))
+    stats = scan_logs(log_dir, output_file, severity=severity)
     
-    if not error_logs:
+    if not stats["matches"]:
         return "No error logs found."
     
-    with open(output_file, "w", encoding="utf-8") as f:
-        f.write("\n".join(error_logs))
-    
-    return f"Extracted {len(error_logs)} error logs to {output_file}"
+    return f"Extracted {stats['matches']} error logs to {output_file}"
 
-def read_log_errors(log_path):
-    for encoding in ["utf-8", "utf-16"]:
-        try:
-            with open(log_path, "r", encoding=encoding) as f:
-                return [line.strip() for line in f if "ERROR" in line]
-        except UnicodeDecodeError:
-            continue
-    return []
+def read_log_errors(log_path, severity="ERROR"):
+    return scan_file(log_path, severity)
 
 def extract_emails(input_file="emails.txt", output_file="extracted_emails.txt"):
     if not os.path.exists(input_file):
         raise FileNotFoundError(f"File not found: {input_file}")
     
-    with open(input_file, "r", encoding="utf-8") as file:
-        emails = re.findall(r"[\w._%+-]+@[\w.-]+\.[a-zA-Z]{2,}", file.read())
+    stats = run_pipeline("extract_emails", input_file, output_file, findall(r"[\w._%+-]+@[\w.-]+\.[a-zA-Z]{2,}"))
     
-    if not emails:
+    if not stats["lines_out"]:
+        os.remove(output_file)
         return "No emails found."
     
-    with open(output_file, "w", encoding="utf-8") as file:
-        file.write("\n".join(emails))
-    
-    return f"Extracted {len(emails)} emails to {output_file}"
+    return f"Extracted {stats['lines_out']} emails to {output_file}"
 
-def execute_sql_query(db_path, query, output_file):
+def execute_sql_query(db_path, query, output_file, params=()):
     if not os.path.exists(db_path):
         raise FileNotFoundError(f"Database not found: {db_path}")
     
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute(query)
-        results = cursor.fetchall()
-        conn.close()
+        # Pooled read-only connection; rows go to the file in fetchmany batches
+        row_count = stream_query(db_path, query, output_file, params)
+    except QueryTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except sqlite3.Error as e:
         raise HTTPException(status_code=500, detail=f"SQL error: {str(e)}")
     
-    if not results:
+    if not row_count:
         return "Query executed, but no results found."
     
-    with open(output_file, "w", encoding="utf-8") as file:
-        file.write("\n".join(", ".join(map(str, row)) for row in results))
-    
     return f"Query results saved to {output_file}"
 
+def markdown_h1_index(input_path="data/format.md", output_path="data/index.md"):
+    # Same output as main.py's extract_h1_index: a numbered list of the file's H1 headings
+    if not os.path.exists(input_path):
+        raise FileNotFoundError(f"Markdown file not found: {input_path}")
+    with open(input_path, "r", encoding="utf-8") as f:
+        headers = extract_h1_index(f.read())
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.writelines(f"{i}. {header}\n" for i, header in enumerate(headers, 1))
+    return "Created markdown index from H1 headers"
+
+def index_docs(docs_dir="docs", index_path="docs/index.json"):
+    if not os.path.exists(docs_dir):
+        raise FileNotFoundError(f"Docs directory not found: {docs_dir}")
+    
+    stats = build_index(docs_dir, index_path)
+    
+    return f"Indexed {stats['files']} docs ({stats['reindexed']} updated) into {index_path}"
+
 def query_gold_ticket_sales(db_path="ticket-sales.db", output_file="ticket-sales-gold.txt"):
     return execute_sql_query(db_path, "SELECT SUM(units * price) FROM tickets WHERE type = 'Gold'", output_file)
 
-def sort_contacts():
-    input_path = "contacts.json"
-    output_path = "sorted_contacts.json"
-
+def sort_contacts(input_path="contacts.json", output_path="sorted_contacts.json", keys=("last_name", "first_name"),
+                  memory_budget=SORT_MEMORY_BUDGET, output_format="json"):
     try:
-        with open(input_path, "r", encoding="utf-8") as file:
-            contacts = json.load(file)
-        
-        sorted_contacts = sorted(contacts, key=lambda c: (c.get("last_name", ""), c.get("first_name", "")))
-        
-        with open(output_path, "w", encoding="utf-8") as file:
-            json.dump(sorted_contacts, file, indent=4)
+        # JSON array or NDJSON in; sorted runs spill to temp files past memory_budget
+        sort_json_file(input_path, output_path, keys, memory_budget, output_format)
         
         return f"Sorted contacts saved to {output_path}"
     except Exception as e:
@@ -153,23 +143,20 @@ def generate_word_embeddings(input_file="text_samples.txt", output_file="word_em
         raise FileNotFoundError(f"File not found: {input_file}")
     
     with open(input_file, "r", encoding="utf-8") as file:
-        sentences = file.readlines()
+        sentences = [s.strip() for s in file if s.strip()]
     
-    embeddings = embedding_model.encode([s.strip() for s in sentences if s.strip()])
-    np.save(output_file, embeddings)
+    embeddings = encode_cached(sentences)
+    save_embeddings(output_file, embeddings, sentences, dtype=EMBEDDING_DTYPE)
     
     return f"Generated embeddings saved to {output_file}"
 
-def handle_a5():
-    logs_dir = Path('data/logs')
-    log_files = sorted(logs_dir.glob('*.log'), key=lambda f: f.stat().st_mtime, reverse=True)
+def handle_a5(count=1):
+    # The catalog keeps logs sorted by mtime between calls; only head bytes are read
+    first_lines = get_catalog('data/logs').first_lines(count)
     
-    if log_files:
-        recent_log = log_files[0]
-        with open(recent_log, 'r') as log_file:
-            first_line = log_file.readline()
+    if first_lines:
         with open('logs-recent.txt', 'w') as output_file:
-            output_file.write(first_line)
+            output_file.write("".join(f"{line}\n" for _, line in first_lines))
     
     return "Extracted first line from most recent log."
 
@@ -181,42 +168,37 @@ from fastapi import HTTPException
 
 def format_markdown(input_path="data/format.md"):
     try:
-        # Ensure the `data/` directory exists
-        if not os.path.exists("data"):
-            os.makedirs("data")
-
         # Ensure the markdown file exists
         if not os.path.exists(input_path):
             raise FileNotFoundError(f"Markdown file not found at: {input_path}")
 
-        # Install Prettier locally (if not already installed)
-        subprocess.run(["npm", "install", "prettier@3.4.2"], check=True)
+        # Long-lived Node workers keep prettier loaded; unchanged files are skipped by hash
+        result = get_prettier_pool().format_files([input_path])[0]
+        if result["status"] == "error":
+            raise PrettierError(result["error"])
 
-        # Use `npx.cmd` for Windows compatibility
-        npx_command = "npx.cmd" if os.name == "nt" else "npx"
-
-        # Run Prettier to format the markdown file
-        result = subprocess.run(
-            [npx_command, "prettier", "--write", input_path],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-
-        logging.info(f"Prettier Output: {result.stdout.strip()}")
+        logging.info(f"Prettier: {input_path} {result['status']} in {result['ms']} ms")
         return f"✅ Successfully formatted {input_path}"
 
     except FileNotFoundError as e:
         logging.error(str(e))
         raise HTTPException(status_code=404, detail=str(e))
 
-    except subprocess.CalledProcessError as e:
-        logging.error(f"⚠️ Prettier error: {e.stderr or e.stdout}")
-        raise HTTPException(status_code=500, detail=f"Prettier error: {e.stderr or e.stdout}")
+    except PrettierError as e:
+        logging.error(f"⚠️ Prettier error: {e}")
+        raise HTTPException(status_code=500, detail=f"Prettier error: {e}")
 
     except Exception as e:
         logging.error(f"❌ Unexpected error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+def format_markdown_files(paths: List[str]):
+    """Formats a batch of files on the Prettier pool; returns per-file status and latency."""
+    missing = [path for path in paths if not os.path.exists(path)]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Files not found: {', '.join(missing)}")
+    return get_prettier_pool().format_files(paths)
     
 
 def query_gold_ticket_sales(db_path="data/ticket-sales.db", output_file="data/ticket-sales-gold.txt"):
@@ -225,12 +207,9 @@ def query_gold_ticket_sales(db_path="data/ticket-sales.db", output_file="data/ti
             logging.error(f"Database not found at: {db_path}")
             raise FileNotFoundError(f"Database file not found at {db_path}")
         
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute("SELECT SUM(units * price) FROM tickets WHERE type = 'Gold'")
-            result = cursor.fetchone()[0]
+            # Read-only: the trigger-maintained summary when set up (python -m app.ticket_aggregates), else SUM
+            result = type_revenue(db_path, "Gold")
             
             if result is None:
                 result = 0
@@ -240,11 +219,9 @@ def query_gold_ticket_sales(db_path="data/ticket-sales.db", output_file="data/ti
                 
             return f"Total Gold ticket sales: {result}"
             
-        except sqlite3.Error as e:
+        except (sqlite3.Error, QueryTimeout) as e:
             logging.error(f"SQL Error: {e}")
             raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
-        finally:
-            conn.close()
             
     except Exception as e:
         logging.error(f"Error in query_gold_ticket_sales: {e}")
@@ -261,67 +238,59 @@ def install_and_run(email: str):
 
     
 
+# Built once at import: phrase -> (handler, job pool), looked up through an inverted keyword index
+task_registry = TaskRegistry()
+for phrase, handler, pool in [
+    # A1 - Install and run datagen
+    ("install and run datagen", lambda: install_and_run("user@example.com"), "subprocess"),
+    ("run datagen", lambda: install_and_run("user@example.com"), "subprocess"),
+
+    # A2 - Format markdown
+    ("format markdown", lambda: format_markdown("data/format.md"), "subprocess"),
+    ("prettier format", lambda: format_markdown("data/format.md"), "subprocess"),
+
+    # A3 - Count weekdays
+    ("count the number of Wednesdays", lambda: count_weekday("data/dates.txt", "data/dates-wednesdays.txt", 2), "default"),
+    ("find Wednesdays", lambda: count_weekday("data/dates.txt", "data/dates-wednesdays.txt", 2), "default"),
+    ("count Wednesdays", lambda: count_weekday("data/dates.txt", "data/dates-wednesdays.txt", 2), "default"),
+
+    # A4 - Sort contacts
+    ("sort contacts", lambda: sort_contacts(), "default"),
+    ("sort contact list", lambda: sort_contacts(), "default"),
+
+    # A5 - Recent logs
+    ("extract first line from most recent log", lambda: handle_a5(), "default"),
+    ("get recent logs", lambda: handle_a5(), "default"),
+
+    # A6 - Extract H1 from markdown
+    ("create markdown index", lambda: markdown_h1_index(), "default"),
+    ("extract markdown headers", lambda: markdown_h1_index(), "default"),
+
+    # Incremental docs/ H1 indexer
+    ("index docs", lambda: index_docs("data/docs", "data/docs/index.json"), "default"),
+
+    # A7 - Extract email sender
+    ("extract emails", lambda: extract_emails("data/email.txt", "data/email-sender.txt"), "default"),
+    ("find email sender", lambda: extract_emails("data/email.txt", "data/email-sender.txt"), "default"),
+
+    # A8 - Similar comments
+    ("find similar comments", lambda: find_similar_comments(), "model"),
+    ("compare comments", lambda: find_similar_comments(), "model"),
+
+    # A9 - SQLite query
+    ("total sales for Gold tickets", lambda: query_gold_ticket_sales("data/ticket-sales.db", "data/ticket-sales-gold.txt"), "default"),
+    ("gold ticket sales", lambda: query_gold_ticket_sales("data/ticket-sales.db", "data/ticket-sales-gold.txt"), "default"),
+
+    # A10 - Word embeddings
+    ("generate word embeddings", lambda: generate_word_embeddings("data/text_samples.txt", EMBEDDINGS_PATH), "model"),
+    ("create embeddings", lambda: generate_word_embeddings("data/text_samples.txt", EMBEDDINGS_PATH), "model"),
+]:
+    task_registry.register(phrase, handler, pool)
+
+# Phase B and any other plugin modules add their own phrases
+load_plugins(task_registry, TASK_PLUGINS)
+
+
 def execute_task(task: str):
-    task_mapping = {
-        # A1 - Install and run datagen
-        "install and run datagen": lambda: install_and_run("user@example.com"),
-        "run datagen": lambda: install_and_run("user@example.com"),
-        
-        # A2 - Format markdown
-        "format markdown": lambda: format_markdown("data/format.md"),
-        "prettier format": lambda: format_markdown("data/format.md"),
-        
-        # A3 - Count weekdays
-        "count the number of Wednesdays": lambda: count_weekday("data/dates.txt", "data/dates-wednesdays.txt", 2),
-        "find Wednesdays": lambda: count_weekday("data/dates.txt", "data/dates-wednesdays.txt", 2),
-        "count Wednesdays": lambda: count_weekday("data/dates.txt", "data/dates-wednesdays.txt", 2),
-        
-        # A4 - Sort contacts
-        "sort contacts": lambda: sort_contacts(),
-        "sort contact list": lambda: sort_contacts(),
-        
-        # A5 - Recent logs
-        "extract first line from most recent log": lambda: handle_a5(),
-        "get recent logs": lambda: handle_a5(),
-        
-        # A6 - Extract H1 from markdown
-        "create markdown index": lambda: extract_h1_index(),
-        "extract markdown headers": lambda: extract_h1_index(),
-        
-        # A7 - Extract email sender
-        "extract emails": lambda: extract_emails("data/email.txt", "data/email-sender.txt"),
-        "find email sender": lambda: extract_emails("data/email.txt", "data/email-sender.txt"),
-        
-        # A8 - Similar comments
-        "find similar comments": lambda: find_similar_comments(),
-        "compare comments": lambda: find_similar_comments(),
-        
-        # A9 - SQLite query
-        "total sales for Gold tickets": lambda: query_gold_ticket_sales("data/ticket-sales.db", "data/ticket-sales-gold.txt"),
-        "gold ticket sales": lambda: query_gold_ticket_sales("data/ticket-sales.db", "data/ticket-sales-gold.txt"),
-        
-        # A10 - Word embeddings
-        "generate word embeddings": lambda: generate_word_embeddings("data/text_samples.txt", "data/embeddings.json"),
-        "create embeddings": lambda: generate_word_embeddings("data/text_samples.txt", "data/embeddings.json")
-    }
-    
-    # Convert task to lowercase for case-insensitive matching
-    task_lower = task.lower().strip()
-    
-    # Try to find an exact match first
-    if task_lower in task_mapping:
-        logging.info(f"Executing task: {task}")
-        return task_mapping[task_lower]()
-    
-    # If no exact match, try to find a partial match
-    for key in task_mapping:
-        if key in task_lower or task_lower in key:
-            logging.info(f"Found similar task '{key}' for input '{task}'")
-            return task_mapping[key]()
-    
-    # If no match found
-    logging.error(f"Unsupported task: {task}")
-    raise HTTPException(
-        status_code=400, 
-        detail=f"Unsupported task. Available tasks are: {', '.join(task_mapping.keys())}"
-    )
\ No newline at end of file
+    """Runs the registered task that best matches the request."""
+    return task_registry.execute(task)
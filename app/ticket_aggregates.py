@@ -0,0 +1,191 @@
+# app/ticket_aggregates.py
+#
+# The summary is an explicit setup step that writes to the database:
+#   python -m app.ticket_aggregates data/ticket-sales.db [--no-triggers] [--wal]
+# type_revenue only ever reads, and uses the summary when it is there and current.
+import argparse
+import logging
+import sqlite3
+from typing import Dict
+
+from app.db import get_pool
+
+# Revenue is summed in integer cents (price is DECIMAL(10,2)), so incremental
+# updates never drift the way repeated float additions would.
+CENTS = "CAST(ROUND({units} * {price} * 100) AS INTEGER)"
+
+SCHEMA = [
+    # Covering index: type filters and SUM(units * price) are answered from the index alone
+    "CREATE INDEX IF NOT EXISTS tickets_type_units_price ON tickets(type, units, price)",
+    """
+    CREATE TABLE IF NOT EXISTS ticket_summary (
+        type TEXT PRIMARY KEY,
+        tickets INTEGER NOT NULL,
+        units INTEGER NOT NULL,
+        revenue_cents INTEGER NOT NULL
+    )
+    """,
+    "CREATE TABLE IF NOT EXISTS ticket_summary_state (key TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+]
+
+TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS ticket_summary_insert AFTER INSERT ON tickets BEGIN
+        INSERT INTO ticket_summary (type, tickets, units, revenue_cents)
+        VALUES (NEW.type, 1, NEW.units, {CENTS.format(units="NEW.units", price="NEW.price")})
+        ON CONFLICT(type) DO UPDATE SET
+            tickets = tickets + 1,
+            units = units + excluded.units,
+            revenue_cents = revenue_cents + excluded.revenue_cents;
+        -- Keep the refresh watermark in step so switching modes never double counts
+        UPDATE ticket_summary_state SET value = MAX(value, NEW.rowid) WHERE key = 'last_rowid';
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS ticket_summary_delete AFTER DELETE ON tickets BEGIN
+        UPDATE ticket_summary SET
+            tickets = tickets - 1,
+            units = units - OLD.units,
+            revenue_cents = revenue_cents - {CENTS.format(units="OLD.units", price="OLD.price")}
+        WHERE type = OLD.type;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS ticket_summary_update AFTER UPDATE OF type, units, price ON tickets BEGIN
+        UPDATE ticket_summary SET
+            tickets = tickets - 1,
+            units = units - OLD.units,
+            revenue_cents = revenue_cents - {CENTS.format(units="OLD.units", price="OLD.price")}
+        WHERE type = OLD.type;
+        INSERT INTO ticket_summary (type, tickets, units, revenue_cents)
+        VALUES (NEW.type, 1, NEW.units, {CENTS.format(units="NEW.units", price="NEW.price")})
+        ON CONFLICT(type) DO UPDATE SET
+            tickets = tickets + 1,
+            units = units + excluded.units,
+            revenue_cents = revenue_cents + excluded.revenue_cents;
+    END
+    """,
+]
+
+TRIGGER_NAMES = [f"ticket_summary_{event}" for event in ("insert", "delete", "update")]
+DROP_TRIGGERS = [f"DROP TRIGGER IF EXISTS {name}" for name in TRIGGER_NAMES]
+
+AGGREGATE_NEW_ROWS = f"""
+    SELECT type, COUNT(*), SUM(units), SUM({CENTS.format(units="units", price="price")}), MAX(rowid)
+    FROM tickets WHERE rowid > ? GROUP BY type
+"""
+
+
+def _apply_new_rows(conn: sqlite3.Connection, after_rowid: int) -> int:
+    """Folds rows with rowid > after_rowid into the summary; returns the new watermark."""
+    watermark = after_rowid
+    for type_, tickets, units, cents, max_rowid in conn.execute(AGGREGATE_NEW_ROWS, (after_rowid,)).fetchall():
+        conn.execute(
+            """
+            INSERT INTO ticket_summary (type, tickets, units, revenue_cents) VALUES (?, ?, ?, ?)
+            ON CONFLICT(type) DO UPDATE SET
+                tickets = tickets + excluded.tickets,
+                units = units + excluded.units,
+                revenue_cents = revenue_cents + excluded.revenue_cents
+            """,
+            (type_, tickets, units, cents),
+        )
+        watermark = max(watermark, max_rowid)
+    conn.execute("INSERT OR REPLACE INTO ticket_summary_state (key, value) VALUES ('last_rowid', ?)", (watermark,))
+    return watermark
+
+
+def has_triggers(conn: sqlite3.Connection) -> bool:
+    """True when ticket_summary exists and all of its triggers are installed on tickets."""
+    names = [row[0] for row in conn.execute(
+        f"SELECT name FROM sqlite_master WHERE name IN ({','.join('?' * (len(TRIGGER_NAMES) + 1))})",
+        ["ticket_summary", *TRIGGER_NAMES],
+    )]
+    return len(names) == len(TRIGGER_NAMES) + 1
+
+
+def _watermark(conn: sqlite3.Connection, rebuild: bool) -> int:
+    """Rowid the summary already covers, clearing it first when it has to be rebuilt from scratch."""
+    row = conn.execute("SELECT value FROM ticket_summary_state WHERE key = 'last_rowid'").fetchone()
+    # A watermark past the last rowid means tickets was recreated under the summary
+    max_rowid = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM tickets").fetchone()[0]
+    if rebuild or row is None or row[0] > max_rowid:
+        conn.execute("DELETE FROM ticket_summary")
+        return 0
+    return row[0]
+
+
+def ensure_aggregates(db_path: str, use_triggers: bool = True, wal: bool = False):
+    """
+    Creates the covering index and the per-type summary table if missing
+
+    This writes to the database, so it is a setup step (see the CLI above or
+    benchmarks/bench_ticket_aggregates.py), never part of a query.
+
+    Args:
+        use_triggers: Keep the summary current on every write. Without triggers,
+            refresh_summary folds in rows appended since the last refresh
+            (insert-only tables), which keeps bulk loads fast.
+        wal: Also switch the database to WAL, so readers don't wait on trigger writes
+    """
+    with get_pool(db_path, readonly=False, wal=wal).connection(timeout=None) as conn:
+        for statement in SCHEMA:
+            conn.execute(statement)
+        # Without the triggers in place, deletes, updates or a recreated tickets table may have gone
+        # unnoticed, so the summary is recomputed before triggers take over
+        _apply_new_rows(conn, _watermark(conn, rebuild=use_triggers and not has_triggers(conn)))
+        for statement in TRIGGERS if use_triggers else DROP_TRIGGERS:
+            conn.execute(statement)
+
+
+def refresh_summary(db_path: str, full: bool = False) -> int:
+    """
+    Brings the summary up to date when triggers are off
+
+    Args:
+        full: Recompute from scratch (needed after deletes or updates)
+
+    Returns:
+        The rowid watermark the summary now covers
+    """
+    with get_pool(db_path, readonly=False).connection(timeout=None) as conn:
+        return _apply_new_rows(conn, _watermark(conn, rebuild=full))
+
+
+def type_revenue(db_path: str, ticket_type: str) -> float:
+    """
+    Total units * price for one ticket type
+
+    Opens the database read-only. The summary is read by primary key only when
+    its triggers are installed, since without them (refresh mode, or tickets
+    recreated) it can lag behind; otherwise this sums tickets, which the
+    covering index answers when it exists.
+    """
+    with get_pool(db_path).connection() as conn:
+        if has_triggers(conn):
+            row = conn.execute("SELECT revenue_cents FROM ticket_summary WHERE type = ?", (ticket_type,)).fetchone()
+            return (row[0] if row else 0) / 100
+        return conn.execute("SELECT SUM(units * price) FROM tickets WHERE type = ?", (ticket_type,)).fetchone()[0] or 0
+
+
+def summary(db_path: str) -> Dict[str, Dict[str, float]]:
+    """All per-type aggregates."""
+    with get_pool(db_path).connection() as conn:
+        rows = conn.execute("SELECT type, tickets, units, revenue_cents FROM ticket_summary").fetchall()
+    return {t: {"tickets": n, "units": u, "revenue": c / 100} for t, n, u, c in rows}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Set up or refresh the per-type ticket summary")
+    parser.add_argument("db_path")
+    parser.add_argument("--no-triggers", action="store_true", help="Refresh on demand instead of on every write")
+    parser.add_argument("--wal", action="store_true", help="Switch the database to WAL journaling")
+    parser.add_argument("--refresh", action="store_true", help="Fold in rows added since the last refresh")
+    parser.add_argument("--full", action="store_true", help="With --refresh, recompute from scratch")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if args.refresh:
+        logging.info(f"Summary covers rows up to {refresh_summary(args.db_path, full=args.full)}")
+    else:
+        ensure_aggregates(args.db_path, use_triggers=not args.no_triggers, wal=args.wal)
+    logging.info(f"Ticket summary for {args.db_path}: {summary(args.db_path)}")
@@ -0,0 +1,177 @@
+# app/transcription.py
+import logging
+import multiprocessing
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import FFMPEG_BINARY, TRANSCRIBE_CHUNK_SECONDS, TRANSCRIBE_WORKERS, WHISPER_MODEL
+from app.metrics import count
+from app.models import get_whisper_model
+
+# Whisper models are trained on 16 kHz mono audio in 30 second windows
+SAMPLE_RATE = 16000
+# Window near each chunk boundary searched for the quietest frame to cut at
+BOUNDARY_SEARCH_SECONDS = 2.0
+FRAME_SAMPLES = SAMPLE_RATE // 50  # 20 ms
+
+# One pool at a time, for the (model name, worker count) it was started with
+_executor: Optional[Tuple[Tuple[str, int], ProcessPoolExecutor]] = None
+_executor_lock = threading.Lock()
+
+
+def decode_audio(path: str, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Decodes any ffmpeg-readable file to mono float32 samples in [-1, 1]
+
+    ffmpeg resamples and writes raw PCM to a pipe, so no intermediate WAV
+    file touches the disk.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Audio file not found: {path}")
+    cmd = [FFMPEG_BINARY, "-nostdin", "-threads", "0", "-i", path,
+           "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate), "-"]
+    try:
+        out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    except FileNotFoundError:
+        raise RuntimeError(f"ffmpeg not found ({FFMPEG_BINARY}), set FFMPEG_BINARY")
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to decode {path}: {e.stderr.decode('utf-8', 'replace').strip()}")
+    return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
+
+
+def split_points(audio: np.ndarray, chunk_seconds: float = TRANSCRIBE_CHUNK_SECONDS,
+                 sample_rate: int = SAMPLE_RATE) -> List[Tuple[int, int]]:
+    """
+    Splits audio into (start, stop) sample ranges of at most chunk_seconds
+
+    Each cut is moved to the quietest 20 ms frame in the last couple of seconds
+    before the limit, so words are rarely split between two segments.
+    """
+    chunk = int(chunk_seconds * sample_rate)
+    search = min(int(BOUNDARY_SEARCH_SECONDS * sample_rate), chunk // 2)
+    ranges = []
+    start = 0
+    while len(audio) - start > chunk:
+        window = audio[start + chunk - search:start + chunk]
+        frames = len(window) // FRAME_SAMPLES
+        energy = np.square(window[:frames * FRAME_SAMPLES]).reshape(frames, FRAME_SAMPLES).sum(axis=1)
+        stop = start + chunk - search + (int(np.argmin(energy)) + 1) * FRAME_SAMPLES
+        ranges.append((start, stop))
+        start = stop
+    if start < len(audio):
+        ranges.append((start, len(audio)))
+    return ranges
+
+
+def _init_worker(model_name: str):
+    # Loaded once per worker process and kept for every segment it handles
+    get_whisper_model(model_name)
+
+
+def _transcribe_segment(args) -> str:
+    samples, model_name, options = args
+    return get_whisper_model(model_name).transcribe(samples, **options)["text"].strip()
+
+
+def _get_executor(model_name: str, workers: int) -> ProcessPoolExecutor:
+    """The pool for this model and size; a pool started for another one is shut down first."""
+    global _executor
+    key = (model_name, workers)
+    with _executor_lock:
+        if _executor is not None and _executor[0] != key:
+            _executor[1].shutdown(wait=False)
+            _executor = None
+        if _executor is None:
+            # spawn, not fork: the server is multi-threaded and may already hold torch/Whisper in memory
+            _executor = key, ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                                 initializer=_init_worker, initargs=(model_name,))
+        return _executor[1]
+
+
+def _drop_executor(executor: ProcessPoolExecutor):
+    """Forgets a broken pool (a worker crashed or was OOM-killed) so the next call starts a new one."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None and _executor[1] is executor:
+            _executor = None
+    executor.shutdown(wait=False)
+
+
+def transcribe(audio: np.ndarray, workers: Optional[int] = None, chunk_seconds: float = TRANSCRIBE_CHUNK_SECONDS,
+               model_name: str = WHISPER_MODEL, **options) -> Tuple[str, int]:
+    """
+    Transcribes 16 kHz float32 samples, segment by segment
+
+    Audio longer than one chunk is fanned out to a persistent process pool
+    whose workers each keep a resident model; a single chunk runs in-process
+    on the shared model. Segment texts are joined in their original order.
+
+    Returns:
+        (text, number of segments)
+    """
+    ranges = split_points(audio, chunk_seconds)
+    workers = workers or TRANSCRIBE_WORKERS
+    jobs = [(audio[start:stop], model_name, options) for start, stop in ranges]
+    if len(jobs) <= 1 or workers <= 1:
+        texts = [_transcribe_segment(job) for job in jobs]
+    else:
+        executor = _get_executor(model_name, workers)
+        try:
+            texts = list(executor.map(_transcribe_segment, jobs))
+        except BrokenProcessPool:
+            _drop_executor(executor)
+            raise
+    return " ".join(text for text in texts if text), len(jobs)
+
+
+def transcribe_file(path: str, output_path: Optional[str] = None, workers: Optional[int] = None,
+                    **options) -> Dict[str, float]:
+    """
+    Decodes, transcribes and optionally saves the text of one audio file
+
+    Args:
+        path: MP3 (or anything ffmpeg reads)
+        output_path: Text file to write, skipped when None
+        workers: Worker processes for long files, defaults to TRANSCRIBE_WORKERS
+        options: Passed to whisper's transcribe, e.g. language="en"
+
+    Returns:
+        Text, audio duration, elapsed seconds, segment count and the real-time
+        factor (processing time / audio duration, below 1 is faster than real time)
+    """
+    start = time.perf_counter()
+    audio = decode_audio(path)
+    decoded = time.perf_counter()
+    try:
+        text, segments = transcribe(audio, workers, **options)
+    except BrokenProcessPool as e:
+        logging.warning(f"Transcription pool broke on {path} ({e}), retrying once on a new pool")
+        text, segments = transcribe(audio, workers, **options)
+    elapsed = time.perf_counter() - start
+
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    duration = len(audio) / SAMPLE_RATE
+    # Everything after decoding is Whisper inference (in this process or the pool)
+    count("model_encode_seconds", elapsed - (decoded - start))
+    count("rows", segments)
+    stats = {
+        "text": text,
+        "audio_seconds": round(duration, 2),
+        "decode_seconds": round(decoded - start, 4),
+        "seconds": round(elapsed, 4),
+        "segments": segments,
+        "real_time_factor": round(elapsed / duration, 4) if duration else 0,
+    }
+    logging.info(f"Transcribed {path}: {stats['audio_seconds']}s of audio in {stats['seconds']}s "
+                 f"({segments} segments, RTF {stats['real_time_factor']})")
+    return stats
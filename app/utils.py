@@ -1,9 +1,8 @@
 # app/utils.py
 import re
-from sentence_transformers import SentenceTransformer, util
 
-# Load model globally (better performance)
-embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+from app.embedding_cache import encode_cached
+from app.similarity import best_pair
 
 def extract_h1_index(markdown_text):
     """Extracts H1 headings from markdown text."""
@@ -14,15 +13,7 @@ def find_similar_comments(comments):
     if len(comments) < 2:
         return None  # Not enough comments to compare
 
-    embeddings = embedding_model.encode(comments, convert_to_tensor=True)
-    best_pair = None
-    best_score = -1
+    embeddings = encode_cached(comments)
+    i, j, _ = best_pair(embeddings)
 
-    for i in range(len(comments)):
-        for j in range(i + 1, len(comments)):
-            similarity = util.cos_sim(embeddings[i], embeddings[j]).item()
-            if similarity > best_score:
-                best_score = similarity
-                best_pair = (comments[i], comments[j])
-
-    return best_pair
+    return (comments[i], comments[j])
@@ -0,0 +1,294 @@
+# Usage: python benchmarks/bench_scale.py --scales 1,100,10000 --repeat 5 --output results.json
+#        python benchmarks/bench_scale.py --scales 1,100 --compare benchmarks/results/<old commit>.json
+#
+# Generates the datagen.py datasets at each scale factor, runs every task against
+# them in a fresh interpreter and records throughput, p50/p99 latency and peak RSS.
+# Results are keyed by scale and task, so two runs (e.g. two commits) can be diffed
+# with --compare, which fails when any p50 regresses by more than --threshold.
+
+import argparse
+import csv
+import datetime
+import json
+import math
+import os
+import platform
+import random
+import resource
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import datagen  # noqa: E402
+
+EMAIL = "bench@example.com"
+# Records per dataset at 1x, matching datagen.py
+BASE = {"dates": 1000, "contacts": 100, "logs": 50, "docs": 100, "comments": 100, "tickets": 1000, "csv": 1000}
+# datagen calls reused for large scales where repeated content doesn't change the work
+# (Faker is slow); comments, dates and tickets are always unique
+VARIANTS = {"logs": 10, "docs": 10, "contacts": 100}
+MARKER = ".bench-scale.json"
+
+# task: (dataset it scales with, unit of throughput)
+TASKS = {
+    "count_weekday": ("dates", "dates"),
+    "sort_contacts": ("contacts", "contacts"),
+    "handle_a5": ("logs", "log files"),
+    "extract_h1_index": ("docs", "docs"),
+    "find_similar_comments": ("comments", "comments"),
+    "query_gold_ticket_sales": ("tickets", "tickets"),
+    "generate_word_embeddings": ("comments", "sentences"),
+    "filter_csv": ("csv", "rows"),
+}
+
+
+def run_task(name):
+    """Runs one task against ./data the way the API does (imported here so only the child pays for it)."""
+    import main
+    from app import tasks
+    import tasks_phase_b
+
+    handlers = {
+        "count_weekday": lambda: tasks.count_weekday("data/dates.txt", "data/dates-wednesdays.txt", 2),
+        "sort_contacts": lambda: tasks.sort_contacts("data/contacts.json", "data/contacts-sorted.json"),
+        "handle_a5": lambda: tasks.handle_a5(10),
+        "extract_h1_index": lambda: main.extract_h1_index(),
+        "find_similar_comments": lambda: main.find_similar_comments(),
+        "query_gold_ticket_sales": lambda: tasks.query_gold_ticket_sales("data/ticket-sales.db",
+                                                                         "data/ticket-sales-gold.txt"),
+        "generate_word_embeddings": lambda: tasks.generate_word_embeddings("data/comments.txt", "data/embeddings.npy"),
+        "filter_csv": lambda: tasks_phase_b.filter_csv_and_return_json("data/sample.csv", "product_name", "Product A",
+                                                                       "data/filtered_data.json"),
+    }
+    return handlers[name]
+
+
+def generate(data_dir, scale):
+    """Writes every dataset at scale x its datagen size into data_dir."""
+    os.makedirs(os.path.join(data_dir, "logs"), exist_ok=True)
+
+    with open(os.path.join(data_dir, "dates.txt"), "w", encoding="utf-8") as f:
+        for k in range(scale):
+            f.write(("\n" if k else "") + "\n".join(datagen.get_dates(f"{EMAIL}:{k}")))
+
+    contacts = [datagen.get_contacts(f"{EMAIL}:{k}") for k in range(min(scale, VARIANTS["contacts"]))]
+    with open(os.path.join(data_dir, "contacts.json"), "w", encoding="utf-8") as f:
+        json.dump([c for k in range(scale) for c in contacts[k % len(contacts)]], f)
+
+    logs = [datagen.get_logs(f"{EMAIL}:{k}") for k in range(min(scale, VARIANTS["logs"]))]
+    now = time.time()
+    rng = random.Random(0)
+    for k in range(scale):
+        for i, (_, text) in enumerate(logs[k % len(logs)]):
+            path = os.path.join(data_dir, "logs", f"log-{k}-{i}.log")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+            age = rng.randint(1, 24 * 60 * 60 * 365)
+            os.utime(path, (now - age, now - age))
+
+    docs = [datagen.get_docs(f"{EMAIL}:{k}") for k in range(min(scale, VARIANTS["docs"]))]
+    with open(os.path.join(data_dir, "format.md"), "w", encoding="utf-8") as f:
+        for k in range(scale):
+            f.write("\n".join(text for _, _, text in docs[k % len(docs)]) + "\n")
+
+    with open(os.path.join(data_dir, "comments.txt"), "w", encoding="utf-8") as f:
+        for k in range(scale):
+            f.write(("\n" if k else "") + "\n".join(datagen.get_comments(f"{EMAIL}:{k}")))
+
+    conn = sqlite3.connect(os.path.join(data_dir, "ticket-sales.db"))
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("CREATE TABLE tickets (type TEXT NOT NULL, units INTEGER NOT NULL, price DECIMAL(10,2) NOT NULL)")
+    for k in range(scale):
+        conn.executemany("INSERT INTO tickets VALUES (?, ?, ?)", datagen.get_tickets(f"{EMAIL}:{k}"))
+        if k % 100 == 99:
+            conn.commit()
+    conn.commit()
+    conn.close()
+
+    # Same columns as data/sample.csv, which datagen does not produce
+    rng = random.Random(0)
+    categories = ["Electronics", "Furniture", "Clothing", "Toys"]
+    with open(os.path.join(data_dir, "sample.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "product_name", "category", "price"])
+        for i in range(BASE["csv"] * scale):
+            writer.writerow([i + 1, f"Product {chr(65 + rng.randrange(26))}", rng.choice(categories),
+                             round(rng.uniform(5, 500), 2)])
+
+    with open(os.path.join(data_dir, MARKER), "w", encoding="utf-8") as f:
+        json.dump({"scale": scale, "base": BASE, "variants": VARIANTS}, f)
+
+
+def ensure_data(root, scale):
+    """Returns a working directory whose data/ holds the datasets at scale, generating them once."""
+    workdir = os.path.join(root, f"scale-{scale}")
+    data_dir = os.path.join(workdir, "data")
+    try:
+        with open(os.path.join(data_dir, MARKER), "r", encoding="utf-8") as f:
+            if json.load(f) == {"scale": scale, "base": BASE, "variants": VARIANTS}:
+                return workdir
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+    shutil.rmtree(workdir, ignore_errors=True)
+    start = time.perf_counter()
+    generate(data_dir, scale)
+    print(f"generated {scale}x datasets in {time.perf_counter() - start:.1f}s at {data_dir}", flush=True)
+    return workdir
+
+
+def percentile(values, q):
+    """Nearest-rank percentile; with few repeats p99 is the slowest run."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q / 100 * len(ordered)) - 1, 0)]
+
+
+def child(task, repeat):
+    """Runs task repeat times in this (fresh) process and prints one JSON report."""
+    handler = run_task(task)
+    import_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    times, error = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            handler()
+        except Exception as e:
+            error = f"{type(e).__name__}: {getattr(e, 'detail', e)}"
+            break
+        times.append(time.perf_counter() - start)
+    print(json.dumps({
+        "times": times,
+        "error": error,
+        # ru_maxrss is KB on Linux
+        "import_rss_mb": round(import_rss / 1024, 1),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "children_peak_rss_mb": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+    }))
+
+
+def measure(workdir, task, scale, repeat, timeout):
+    """Runs one (task, scale) in a fresh interpreter so peak RSS belongs to that task alone."""
+    dataset, unit = TASKS[task]
+    env = dict(os.environ, WARMUP_MODELS="", METRICS_ENABLED="0", PYTHONPATH=ROOT,
+               # A fresh embedding cache per run, so the first run pays for the encode
+               EMBEDDING_CACHE_PATH=os.path.join(workdir, "data", f".embedding-cache-{task}.db"))
+    if os.path.exists(env["EMBEDDING_CACHE_PATH"]):
+        os.remove(env["EMBEDDING_CACHE_PATH"])
+    try:
+        result = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", task, "--repeat", str(repeat)],
+                                cwd=workdir, env=env, capture_output=True, text=True, timeout=timeout)
+        report = json.loads(result.stdout.strip().splitlines()[-1])
+    except subprocess.TimeoutExpired:
+        return {"error": f"timed out after {timeout}s"}
+    except (IndexError, json.JSONDecodeError):
+        return {"error": (result.stderr.strip().splitlines() or ["no output"])[-1]}
+
+    times = report.pop("times")
+    records = BASE[dataset] * scale
+    entry = {"records": records, "unit": unit, "runs": len(times), **report}
+    if times:
+        p50 = percentile(times, 50)
+        # Later runs can hit caches (ticket aggregates, embedding cache, log catalog); the first one cannot
+        entry.update(first_ms=round(times[0] * 1000, 3), p50_ms=round(p50 * 1000, 3),
+                     p99_ms=round(percentile(times, 99) * 1000, 3),
+                     throughput=round(records / p50, 1) if p50 else None)
+    return entry
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results, baseline_path, threshold):
+    """Prints p50 ratios against a previous results file; returns the regressions."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\nvs {baseline_path} ({baseline.get('revision')}):")
+    regressions = []
+    for scale, tasks in results["results"].items():
+        for task, entry in tasks.items():
+            old = baseline.get("results", {}).get(scale, {}).get(task, {})
+            if "p50_ms" not in entry or "p50_ms" not in old or not old["p50_ms"]:
+                continue
+            ratio = entry["p50_ms"] / old["p50_ms"]
+            flag = "  REGRESSION" if ratio > threshold else ""
+            print(f"  {scale:>7}x {task:<26} p50 {old['p50_ms']:>10.2f} -> {entry['p50_ms']:>10.2f} ms "
+                  f"({ratio:.2f}x){flag}")
+            if flag:
+                regressions.append((scale, task, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scale-factor benchmark over the datagen datasets")
+    parser.add_argument("--scales", default="1,100", help="Comma separated scale factors, e.g. 1,100,10000")
+    parser.add_argument("--tasks", default=",".join(TASKS), help="Comma separated subset of tasks")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per task and scale")
+    parser.add_argument("--timeout", type=float, default=3600, help="Seconds before a (task, scale) is abandoned")
+    parser.add_argument("--data-dir", default=None, help="Keep generated datasets here and reuse them between runs")
+    parser.add_argument("--output", default=None, help="Results file (default benchmarks/results/<revision>.json)")
+    parser.add_argument("--compare", default=None, help="Previous results file to diff p50 latencies against")
+    parser.add_argument("--threshold", type=float, default=1.2, help="p50 ratio counted as a regression")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.repeat)
+        return
+
+    scales = [int(s) for s in args.scales.split(",") if s.strip()]
+    tasks = [t.strip() for t in args.tasks.split(",") if t.strip()]
+    unknown = [t for t in tasks if t not in TASKS]
+    if unknown:
+        parser.error(f"unknown tasks: {', '.join(unknown)} (choose from {', '.join(TASKS)})")
+
+    revision = git_revision()
+    results = {
+        "revision": revision,
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "repeat": args.repeat,
+        "results": {},
+    }
+    root = args.data_dir or tempfile.mkdtemp(prefix="bench-scale-")
+    try:
+        for scale in scales:
+            workdir = ensure_data(root, scale)
+            results["results"][str(scale)] = {}
+            for task in tasks:
+                entry = measure(workdir, task, scale, args.repeat, args.timeout)
+                results["results"][str(scale)][task] = entry
+                if "p50_ms" in entry:
+                    print(f"{scale:>7}x {task:<26} p50 {entry['p50_ms']:>10.2f} ms  p99 {entry['p99_ms']:>10.2f} ms  "
+                          f"{entry['throughput']:>12,.0f} {entry['unit']}/s  peak {entry['peak_rss_mb']:>7.1f} MB",
+                          flush=True)
+                else:
+                    print(f"{scale:>7}x {task:<26} FAILED {entry['error']}", flush=True)
+    finally:
+        if not args.data_dir:
+            shutil.rmtree(root, ignore_errors=True)
+
+    output = args.output or os.path.join(ROOT, "benchmarks", "results", f"{revision}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# Usage: python benchmarks/bench_startup.py --runs 5 --max-seconds 3
+#
+# Measures cold start of the API (a fresh interpreter importing main) and fails
+# when the median exceeds --max-seconds or a heavy dependency is imported eagerly.
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Task dependencies that must only load when their task first runs
+LAZY_MODULES = ["whisper", "torch", "sentence_transformers", "pydub", "bs4", "PIL", "duckdb", "markdown", "httpx"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "loaded": [m for m in %r if m in sys.modules],
+                  "tasks": len(main.app_task_registry.phrases())}))
+""" % (LAZY_MODULES,)
+
+
+def cold_start():
+    """Imports main in a fresh interpreter and returns its probe report plus wall time."""
+    env = dict(os.environ, WARMUP_MODELS="")
+    result = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, env=env, capture_output=True, text=True,
+                            check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(limit=10):
+    """Top cumulative import times (ms) from python -X importtime."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=ROOT,
+                            env=dict(os.environ, WARMUP_MODELS=""), capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]) / 1000, parts[2].rstrip()))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start benchmark for the API")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, default=3.0, help="Fail when the median import exceeds this")
+    args = parser.parse_args()
+
+    reports = [cold_start() for _ in range(args.runs)]
+    times = [report["seconds"] for report in reports]
+    median = statistics.median(times)
+    print(f"import main: median {median:.3f}s, min {min(times):.3f}s, max {max(times):.3f}s over {args.runs} runs, "
+          f"{reports[0]['tasks']} task phrases")
+    for ms, module in slowest_imports():
+        print(f"  {ms:>9.1f} ms  {module}")
+
+    failures = []
+    if median > args.max_seconds:
+        failures.append(f"cold start {median:.3f}s exceeds target {args.max_seconds}s")
+    if reports[0]["loaded"]:
+        failures.append(f"heavy modules imported at startup: {', '.join(reports[0]['loaded'])}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# Usage: python benchmarks/bench_ticket_aggregates.py --rows 10000000
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ticket_aggregates import ensure_aggregates, type_revenue  # noqa: E402
+
+TICKET_TYPES = ["Gold", "Silver", "Bronze"]
+GOLD_SUM = "SELECT SUM(units * price) FROM tickets WHERE type = 'Gold'"
+
+
+def timed(label, func, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{label:<40} {elapsed * 1000:>12.3f} ms   {result}")
+    return result
+
+
+def create_tickets(path, rows, batch=100_000):
+    """Same schema and value ranges as datagen.a10_ticket_sales, at any size."""
+    random.seed(0)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("CREATE TABLE tickets (type TEXT NOT NULL, units INTEGER NOT NULL, price DECIMAL(10,2) NOT NULL)")
+    for start in range(0, rows, batch):
+        conn.executemany(
+            "INSERT INTO tickets VALUES (?, ?, ?)",
+            [(random.choice(TICKET_TYPES), random.randint(1, 10), round(random.uniform(50, 150), 2))
+             for _ in range(min(batch, rows - start))],
+        )
+        conn.commit()
+    conn.close()
+
+
+def scan(path):
+    conn = sqlite3.connect(path)
+    try:
+        return round(conn.execute(GOLD_SUM).fetchone()[0], 2)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--dir", default=None, help="Where to create the temporary database")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        db_path = os.path.join(tmp, "ticket-sales.db")
+        timed(f"create {args.rows:,} rows", lambda: create_tickets(db_path, args.rows))
+        full_scan = timed("full table scan", lambda: scan(db_path))
+        # Bulk-loaded table: build index + summary once, then keep it current with triggers
+        timed("build covering index + summary", lambda: ensure_aggregates(db_path))
+        timed("covering index scan", lambda: scan(db_path))
+        summary = timed("summary lookup (avg of 1000)", lambda: type_revenue(db_path, "Gold"), repeat=1000)
+        print(f"summary matches scan: {abs(summary - full_scan) < 0.01}")
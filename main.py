@@ -4,17 +4,35 @@ import os
 import re
 import sqlite3
 import json
+import time
 import numpy as np
 from pathlib import Path
-from typing import List
-from fastapi import FastAPI, HTTPException, APIRouter
+from typing import List, Optional
+from fastapi import FastAPI, HTTPException, APIRouter, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
-from sentence_transformers import SentenceTransformer
 import subprocess
 
 from fastapi import FastAPI
 from app.api import router  # ✅ Import API router
 from app.tasks import install_and_run  # ✅ Corrected import
+from app.tasks import task_registry as app_task_registry
+from app.config import COMMENT_EMBEDDINGS_PATH, EMBEDDING_DTYPE, EMBEDDINGS_PATH, SORT_MEMORY_BUDGET, WARMUP_MODELS
+from app.models import warm_up
+from app.embedding_cache import encode_cached
+from app.embedding_store import BINARY_SUFFIXES, load_embeddings, save_embeddings
+from app.similarity import pairs_above_threshold
+from app.task_registry import TaskRegistry
+from app.dates import WEEKDAYS, parse_weekdays, weekday_filter
+from app.streaming import findall, run_pipeline, unique
+from app.log_catalog import get_catalog
+from app.external_sort import sort_json_file
+from app.docs_index import build_index
+from app.db import query_scalar
+from app.file_access import gzip_chunks, iter_file, iter_line_range, tail_offset
+from app.formatter import get_prettier_pool
+from app.metrics import count, measure, metered, record_sent
 
 
 app = FastAPI()
@@ -23,8 +41,15 @@ app.include_router(router)
 
 router = APIRouter()
 
-# Initialize embedding model
-embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+
+@app.on_event("startup")
+def warm_up_models():
+    """Load the configured models once before serving requests."""
+    if WARMUP_MODELS:
+        logging.info(f"Warm-up model stats: {warm_up(WARMUP_MODELS)}")
+    # Both registries route requests: app.tasks for /run jobs, this module's for execute_task
+    app_task_registry.warm()
+    task_registry.warm()
 
 def install_and_run(email: str):
     # Implementation for installing and running datagen
@@ -41,46 +66,39 @@ def count_weekday(input_path: str, output_path: str, weekday: int):
         if not os.path.exists(input_path):
             raise FileNotFoundError(f"Input file not found: {input_path}")
 
-        with open(input_path, 'r') as f:
-            lines = f.readlines()
-            logging.info(f"Dates: {lines}")
-        
-        filtered_dates = [date.strip() for date in lines if is_valid_weekday(date.strip(), weekday)]
-        
-        with open(output_path, 'w') as f:
-            f.write("\n".join(filtered_dates))
+        counts = np.zeros(7, dtype=np.int64)
+        stats = run_pipeline("count_weekday", input_path, output_path, weekday_filter(weekday, counts))
+        matched = stats["lines_out"]
+        logging.info(f"Weekday counts: {dict(zip(WEEKDAYS, counts.tolist()))}")
         
-        return f"Found {len(filtered_dates)} dates matching weekday {weekday} and saved to {output_path}"
+        return f"Found {matched} dates matching weekday {weekday} and saved to {output_path}"
     except Exception as e:
         logging.error(f"Error in counting weekdays: {e}")
         raise HTTPException(status_code=500, detail=f"Error in counting weekdays: {str(e)}")
 
 def is_valid_weekday(date_str, weekday):
-    try:
-        return datetime.datetime.strptime(date_str, "%Y-%m-%d").date().weekday() == weekday
-    except ValueError:
-        return False
-
-def sort_contacts():
-    with open("data/contacts.json", "r") as f:
-        contacts = json.load(f)
-    contacts.sort(key=lambda x: (x["last_name"], x["first_name"]))
-    with open("data/contacts-sorted.json", "w") as f:
-        json.dump(contacts, f, indent=4)
+    return parse_weekdays([date_str])[0] == weekday
+
+def sort_contacts(input_path: str = "data/contacts.json", output_path: str = "data/contacts-sorted.json",
+                  keys=("last_name", "first_name"), memory_budget: int = SORT_MEMORY_BUDGET):
+    # Streams the input and spills sorted runs to disk once memory_budget is reached
+    sort_json_file(input_path, output_path, keys, memory_budget)
     return "Contacts sorted and saved."
 
-def handle_a5():
-    log_files = sorted(Path("data/").glob("*.log"), key=os.path.getmtime, reverse=True)
-    if not log_files:
+def handle_a5(count: int = 1):
+    # The catalog keeps logs sorted by mtime between calls; only head bytes are read
+    first_lines = get_catalog("data/").first_lines(count)
+    if not first_lines:
         return "No log files found."
-    with open(log_files[0], "r") as f:
-        first_line = f.readline().strip()
     with open("data/logs-recent.txt", "w") as f:
-        f.write(first_line)
+        f.write("\n".join(line.strip() for _, line in first_lines))
     return "Extracted first line from most recent log."
 
 def format_markdown(file_path: str):
-    subprocess.run(["prettier", "--write", file_path], check=True)
+    # Persistent Prettier workers instead of a Node start per call
+    result = get_prettier_pool().format_files([file_path])[0]
+    if result["status"] == "error":
+        raise HTTPException(status_code=500, detail=f"Prettier error: {result['error']}")
     return "Markdown formatted successfully."
 
 def extract_h1_index():
@@ -92,91 +110,100 @@ def extract_h1_index():
             f.write(f"{i}. {header}\n")
     return "Created markdown index from H1 headers"
 
+def index_docs(docs_dir: str = "data/docs", index_path: str = "data/docs/index.json"):
+    stats = build_index(docs_dir, index_path)
+    return f"Indexed {stats['files']} docs ({stats['reindexed']} updated) into {index_path}"
+
 def query_gold_ticket_sales(db_path: str, output_path: str):
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute("SELECT SUM(price) FROM tickets WHERE category = 'Gold'")
-    total_sales = cursor.fetchone()[0] or 0
+    total_sales = query_scalar(db_path, "SELECT SUM(price) FROM tickets WHERE category = ?", ("Gold",)) or 0
     with open(output_path, "w") as f:
         f.write(str(total_sales))
-    conn.close()
     return f"Total Gold ticket sales: {total_sales}"
 
-def generate_word_embeddings(input_path: str, output_path: str):
+def generate_word_embeddings(input_path: str, output_path: str, fmt: str = None, dtype: str = EMBEDDING_DTYPE):
     with open(input_path, "r") as f:
         sentences = [line.strip() for line in f.readlines()]
-    embeddings = embedding_model.encode(sentences).tolist()
-    with open(output_path, "w") as f:
-        json.dump(embeddings, f)
-    return "Generated word embeddings."
+    embeddings = encode_cached(sentences)
+    fmt = save_embeddings(output_path, embeddings, sentences, fmt=fmt, dtype=dtype)
+    return f"Generated word embeddings ({fmt})."
 
 def extract_emails(input_path: str, output_path: str):
-    with open(input_path, "r") as f:
-        content = f.read()
-    emails = list(set(re.findall(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}", content)))
-    with open(output_path, "w") as f:
-        f.write("\n".join(emails))
+    run_pipeline("extract_emails", input_path, output_path,
+                 findall(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}"), unique)
     return "Extracted emails saved."
 
-def find_similar_comments():
-    with open("data/comments.txt", "r") as f:
-        comments = [line.strip() for line in f.readlines()]
-    
-    embeddings = embedding_model.encode(comments)
+def comment_embeddings(comments_path: str = "data/comments.txt", embeddings_path: str = COMMENT_EMBEDDINGS_PATH):
+    # Re-encoded only when the comments changed since the embeddings were written
+    if not os.path.exists(embeddings_path) or os.path.getmtime(embeddings_path) < os.path.getmtime(comments_path):
+        generate_word_embeddings(comments_path, embeddings_path)
+    return embeddings_path
+
+def find_similar_comments(embeddings_path: str = None):
+    if embeddings_path:
+        if not os.path.exists(embeddings_path):
+            raise HTTPException(status_code=404, detail=f"Embeddings file not found: {embeddings_path}")
+        # Precomputed embeddings are memory-mapped instead of re-encoded
+        embeddings, comments = load_embeddings(embeddings_path)
+    else:
+        with open("data/comments.txt", "r") as f:
+            comments = [line.strip() for line in f.readlines()]
+        embeddings = encode_cached(comments)
+    if comments is None:
+        raise HTTPException(status_code=400, detail=f"No sentence order stored for {embeddings_path}")
     
-    similar_pairs = []
-    for i in range(len(comments)):
-        for j in range(i + 1, len(comments)):
-            similarity = np.dot(embeddings[i], embeddings[j]) / (
-                np.linalg.norm(embeddings[i]) * np.linalg.norm(embeddings[j])
-            )
-            if similarity > 0.8:
-                similar_pairs.append((comments[i], comments[j], similarity))
+    # Blocked matrix multiplies instead of a Python loop over every pair
+    similar_pairs = pairs_above_threshold(embeddings, 0.8)
     
     with open("data/similar_comments.txt", "w") as f:
-        for c1, c2, sim in sorted(similar_pairs, key=lambda x: x[2], reverse=True):
-            f.write(f"Similarity: {sim:.2f}\n1: {c1}\n2: {c2}\n\n")
+        for i, j, sim in similar_pairs:
+            f.write(f"Similarity: {sim:.2f}\n1: {comments[i]}\n2: {comments[j]}\n\n")
     
     return f"Found {len(similar_pairs)} similar comment pairs"
 
+task_registry = TaskRegistry()
+for phrase, handler in [
+    ("install and run datagen", lambda: install_and_run("user@example.com")),
+    ("run datagen", lambda: install_and_run("user@example.com")),
+    ("format markdown", lambda: format_markdown("data/format.md")),
+    ("prettier format", lambda: format_markdown("data/format.md")),
+    ("count the number of Wednesdays", lambda: count_weekday("data/dates.txt", "data/dates-wednesdays.txt", 2)),
+    ("find Wednesdays", lambda: count_weekday("data/dates.txt", "data/dates-wednesdays.txt", 2)),
+    ("count Wednesdays", lambda: count_weekday("data/dates.txt", "data/dates-wednesdays.txt", 2)),
+    ("sort contacts", lambda: sort_contacts()),
+    ("sort contact list", lambda: sort_contacts()),
+    ("extract first line from most recent log", lambda: handle_a5()),
+    ("get recent logs", lambda: handle_a5()),
+    ("create markdown index", lambda: extract_h1_index()),
+    ("extract markdown headers", lambda: extract_h1_index()),
+    ("index docs", lambda: index_docs()),
+    ("create docs index", lambda: index_docs()),
+    ("extract emails", lambda: extract_emails("data/emails.txt", "data/extracted_emails.txt")),
+    ("find email sender", lambda: extract_emails("data/emails.txt", "data/extracted_emails.txt")),
+    ("find similar comments", lambda: find_similar_comments(comment_embeddings())),
+    ("compare comments", lambda: find_similar_comments(comment_embeddings())),
+    ("total sales for Gold tickets", lambda: query_gold_ticket_sales("data/ticket-sales.db", "data/ticket-sales-gold.txt")),
+    ("gold ticket sales", lambda: query_gold_ticket_sales("data/ticket-sales.db", "data/ticket-sales-gold.txt")),
+    ("generate word embeddings", lambda: generate_word_embeddings("data/text_samples.txt", EMBEDDINGS_PATH)),
+    ("create embeddings", lambda: generate_word_embeddings("data/text_samples.txt", EMBEDDINGS_PATH)),
+]:
+    task_registry.register(phrase, handler)
+
 def execute_task(task: str):
-    task_mapping = {
-        "install and run datagen": lambda: install_and_run("user@example.com"),
-        "run datagen": lambda: install_and_run("user@example.com"),
-        "format markdown": lambda: format_markdown("data/format.md"),
-        "prettier format": lambda: format_markdown("data/format.md"),
-        "count the number of Wednesdays": lambda: count_weekday("data/dates.txt", "data/dates-wednesdays.txt", 2),
-        "find Wednesdays": lambda: count_weekday("data/dates.txt", "data/dates-wednesdays.txt", 2),
-        "count Wednesdays": lambda: count_weekday("data/dates.txt", "data/dates-wednesdays.txt", 2),
-        "sort contacts": lambda: sort_contacts(),
-        "sort contact list": lambda: sort_contacts(),
-        "extract first line from most recent log": lambda: handle_a5(),
-        "get recent logs": lambda: handle_a5(),
-        "create markdown index": lambda: extract_h1_index(),
-        "extract markdown headers": lambda: extract_h1_index(),
-        "extract emails": lambda: extract_emails("data/emails.txt", "data/extracted_emails.txt"),
-        "find email sender": lambda: extract_emails("data/emails.txt", "data/extracted_emails.txt"),
-        "find similar comments": lambda: find_similar_comments(),
-        "compare comments": lambda: find_similar_comments(),
-        "total sales for Gold tickets": lambda: query_gold_ticket_sales("data/ticket-sales.db", "data/ticket-sales-gold.txt"),
-        "gold ticket sales": lambda: query_gold_ticket_sales("data/ticket-sales.db", "data/ticket-sales-gold.txt"),
-        "generate word embeddings": lambda: generate_word_embeddings("data/text_samples.txt", "data/embeddings.json"),
-        "create embeddings": lambda: generate_word_embeddings("data/text_samples.txt", "data/embeddings.json")
-    }
-    task_lower = task.lower().strip()
-    if task_lower in task_mapping:
-        logging.info(f"Executing task: {task}")
-        return task_mapping[task_lower]()
-    for key in task_mapping:
-        if key in task_lower or task_lower in key:
-            logging.info(f"Found similar task '{key}' for input '{task}'")
-            return task_mapping[key]()
-    logging.error(f"Unsupported task: {task}")
-    raise HTTPException(status_code=400, detail=f"Unsupported task. Available tasks are: {', '.join(task_mapping.keys())}")
+    return task_registry.execute(task)
 
 # Add route to router instead of directly to app
 @app.get("/read")
-async def read_file(path: str):
+async def read_file(request: Request, path: str, offset: int = 0, limit: int = 100, raw: bool = False,
+                    gzip: bool = False, lines: Optional[str] = None, tail: Optional[int] = None):
+    """
+    Read a file under data/
+
+    Default: {"content": ...} for text files, or a row slice of .npy/.emb embeddings.
+    raw=true: the file as-is via FileResponse (sendfile, Range, ETag / If-None-Match),
+        or gzip-compressed chunks with gzip=true when the client accepts it.
+    lines=X-Y (1-based, inclusive; "X-" for to the end) or tail=N: only those lines,
+        streamed as text after seeking instead of reading the whole file.
+    """
     base_dir = Path("data").resolve()  # Ensure base directory is absolute
     file_path = (base_dir / path).resolve()
 
@@ -184,7 +211,67 @@ async def read_file(path: str):
     if not file_path.is_file() or not str(file_path).startswith(str(base_dir)):
         raise HTTPException(status_code=404, detail=f"File not found: {file_path}")
 
-    return {"content": file_path.read_text(encoding="utf-8")}
+    if lines is not None or tail is not None:
+        if tail is not None:
+            chunks = iter_file(str(file_path), tail_offset(str(file_path), tail))
+        else:
+            first, _, last = lines.partition("-")
+            try:
+                first, last = int(first), int(last) if last else None
+            except ValueError:
+                raise HTTPException(status_code=400, detail=f"Invalid line range: {lines}")
+            chunks = iter_line_range(str(file_path), first, last)
+        mode = "tail" if tail is not None else "lines"
+        body = metered(chunks, "read", mode=mode)
+        # Closing after the send also records streams the client dropped before the first chunk
+        return StreamingResponse(body, media_type="text/plain; charset=utf-8",
+                                 background=BackgroundTask(body.close))
+
+    if raw:
+        started = time.perf_counter()
+        response = FileResponse(file_path, stat_result=file_path.stat())
+        compress = gzip and "gzip" in request.headers.get("accept-encoding", "")
+        etag = response.headers["etag"]
+        if compress:
+            # The gzip body is a different representation, so it must not share the file's strong ETag
+            etag = etag[:-1] + '-gzip"'
+        if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+            return Response(status_code=304, headers={"etag": etag})
+        if compress:
+            # Compressed bodies have no stable byte offsets, so Range is not offered here
+            body = metered(gzip_chunks(iter_file(str(file_path))), "read", mode="gzip")
+            return StreamingResponse(
+                body,
+                media_type=response.media_type,
+                headers={"content-encoding": "gzip", "etag": etag, "vary": "Accept-Encoding"},
+                background=BackgroundTask(body.close),
+            )
+        # The body goes out with sendfile after we return, so it is recorded from a background task once
+        # sent; bytes are the whole file unless ranged
+        size = None if "range" in request.headers else int(response.headers["content-length"])
+        response.background = BackgroundTask(record_sent, "read", started, size, mode="raw")
+        return response
+
+    if file_path.suffix in BINARY_SUFFIXES:
+        # Binary embeddings are memory-mapped; only the requested rows are read
+        with measure("read", mode="embeddings"):
+            embeddings, sentences = load_embeddings(str(file_path))
+            rows = slice(offset, offset + limit)
+            selected = embeddings[rows]
+            count("rows", len(selected))
+            count("bytes_read", selected.nbytes)
+            return {
+                "shape": list(embeddings.shape),
+                "dtype": str(embeddings.dtype),
+                "offset": offset,
+                "sentences": sentences[rows] if sentences is not None else None,
+                "embeddings": selected.astype("float32").tolist(),
+            }
+
+    with measure("read", mode="text"):
+        content = file_path.read_text(encoding="utf-8")
+        count("bytes_read", file_path.stat().st_size)
+    return {"content": content}
 
 
 class TaskRequest(BaseModel):
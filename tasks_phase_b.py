@@ -1,43 +1,32 @@
+# tasks_phase_b.py
+#
+# Phase B task plugin. Importing this module must stay cheap and side-effect
+# free: heavy dependencies (markdown, httpx, PIL, DuckDB, Whisper) are imported
+# inside the task that needs them, and examples only run under __main__.
 import os
 import subprocess
-import requests
-import markdown
 import logging
 from fastapi import HTTPException
 import sqlite3
-from bs4 import BeautifulSoup
-from PIL import Image
-import csv
-import json
-from fastapi import FastAPI, File, UploadFile
 from typing import List, Optional
-from io import StringIO
-import whisper
-import ctypes
-from pydub import AudioSegment
 
-# Ensure logging is configured properly (e.g., in the main script)
-logging.basicConfig(level=logging.INFO)
+from app.config import PHASE_B_NETWORK_TASKS
+from app.db import QueryTimeout, get_pool, stream_query
+
 
 def convert_markdown_to_html(input_path: str, output_path: str):
     """
     Convert markdown file to HTML
     """
+    from app.markdown_render import render_file
+
     try:
         # Check if the input file exists
         if not os.path.exists(input_path):
             raise HTTPException(status_code=404, detail=f"Markdown file {input_path} not found")
         
-        # Read the markdown content from the file
-        with open(input_path, 'r', encoding='utf-8') as f:
-            markdown_content = f.read()
-        
-        # Convert markdown to HTML
-        html_content = markdown.markdown(markdown_content)
-        
-        # Write the HTML content to the output file
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        # Convert with the process's reusable renderer and write the HTML
+        render_file(input_path, output_path)
         
         logging.info(f"Markdown successfully converted to HTML and saved to {output_path}")
         return "Successfully converted markdown to HTML"
@@ -47,28 +36,37 @@ def convert_markdown_to_html(input_path: str, output_path: str):
         raise HTTPException(status_code=500, detail=f"Failed to convert markdown to HTML: {str(e)}")
 
 
-input_path = "data/example.md"  # Make sure this is the correct path
-output_path = "data/example.html"  # The output HTML file path
+def convert_markdown_tree_to_html(source_dir: str, output_dir: str, force: bool = False):
+    """
+    Convert every markdown file under a directory to HTML, skipping unchanged sources
+    """
+    from app.markdown_render import render_tree
 
-result = convert_markdown_to_html(input_path, output_path)
-print(result)
+    try:
+        stats = render_tree(source_dir, output_dir, force=force)
+        return (f"Rendered {stats['rendered']} markdown files, skipped {stats['skipped']}, failed {stats['failed']} "
+                f"in {stats['seconds']}s (slowest {stats['slowest_ms']} ms)")
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error converting markdown tree to HTML: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to convert markdown to HTML: {str(e)}")
 
 
 def fetch_api_data(api_url: str, output_path: str):
     """
     Fetch data from API and save to file
     """
+    from app.fetcher import fetch_url
+
     try:
         logging.basicConfig(level=logging.DEBUG)  # Log all messages of level DEBUG and above
         logging.info(f"Fetching data from: {api_url}")
         
-        response = requests.get(api_url)
-        response.raise_for_status()
-        
-        logging.info(f"API Response Status: {response.status_code}")
+        # Streamed to disk; a cached copy is revalidated with ETag / Last-Modified
+        result = fetch_url(api_url, output_path)
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(response.text)
+        logging.info(f"API Response Status: {result['status']} ({result['bytes']} bytes)")
         
         logging.info(f"Data saved to {output_path}")
         return "Successfully fetched API data"
@@ -76,6 +74,20 @@ def fetch_api_data(api_url: str, output_path: str):
         logging.error(f"Error fetching API data: {str(e)}")
         raise Exception(f"Failed to fetch API data: {str(e)}")
 
+def fetch_multiple_api_data(targets: dict):
+    """
+    Fetch several URLs concurrently and save each to its own file
+
+    :param targets: {url: output_path}
+    """
+    from app.fetcher import fetch_urls
+
+    results = fetch_urls(targets)
+    failed = [result for result in results if "error" in result]
+    if failed:
+        logging.error(f"Failed to fetch {len(failed)} of {len(results)} URLs")
+    return results
+
 def clone_and_commit_repo(repo_url: str, commit_message: str, clone_dir: str):
     """
     Clone a Git repository and make a commit if there are changes.
@@ -110,138 +122,122 @@ def clone_and_commit_repo(repo_url: str, commit_message: str, clone_dir: str):
         logging.error(f"Error: {e}")
         return f"Failed to clone and commit: {e}"
 
-# Example Usage
-repo_url = "https://github.com/VarunKarthik-18/dataworks-agent.git"  # Replace with your repo URL
-commit_message = "Automated commit: added new file"
-clone_dir = "C:/Users/B Varun karthik/dataworks-agent/cloned_repo"  # Directory to clone into
-
-# Call the clone_and_commit_repo function
-result = clone_and_commit_repo(repo_url, commit_message, clone_dir)
-print(result)
-
-import sqlite3
-import os
-
-# Path to SQLite database
-db_path = r"C:\Users\B Varun karthik\dataworks-agent\data\ticket-sales.db"
-
-# Ensure the directory exists
-os.makedirs(os.path.dirname(db_path), exist_ok=True)
-
-# Connect to SQLite (this will create the file if it doesn't exist)
-conn = sqlite3.connect(db_path)
-cursor = conn.cursor()
-
-# Drop the sales table if it already exists to avoid schema mismatch
-cursor.execute("DROP TABLE IF EXISTS sales")
-
-# Create the sales table with the correct schema
-cursor.execute("""
-    CREATE TABLE IF NOT EXISTS sales (
-        id INTEGER PRIMARY KEY,
-        product_name TEXT,
-        quantity INTEGER,
-        price REAL
-    )
-""")
-
-# Insert some sample data
-cursor.executemany("""
-    INSERT INTO sales (product_name, quantity, price) VALUES (?, ?, ?)
-""", [
-    ("Product A", 10, 99.99),
-    ("Product B", 5, 199.99),
-    ("Product C", 2, 299.99)
-])
-
-# Commit changes and close the connection
-conn.commit()
-conn.close()
-
-print("Database created and sample data inserted.")
-
-# Example Usage for running SQL query
-def run_sql_query(db_path: str, query: str):
+def create_sample_sales_db(db_path: str):
     """
-    Connect to the SQLite database and run the provided query.
+    Recreate the sales table with a few sample rows
     """
-    try:
-        # Connect to the SQLite database
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-
-        print(f"Running query on {db_path}: {query}")
+    # Ensure the directory exists
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+
+    # Connect to SQLite (this will create the file if it doesn't exist)
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    # Drop the sales table if it already exists to avoid schema mismatch
+    cursor.execute("DROP TABLE IF EXISTS sales")
+
+    # Create the sales table with the correct schema
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sales (
+            id INTEGER PRIMARY KEY,
+            product_name TEXT,
+            quantity INTEGER,
+            price REAL
+        )
+    """)
+
+    # Insert some sample data
+    cursor.executemany("""
+        INSERT INTO sales (product_name, quantity, price) VALUES (?, ?, ?)
+    """, [
+        ("Product A", 10, 99.99),
+        ("Product B", 5, 199.99),
+        ("Product C", 2, 299.99)
+    ])
+
+    # Commit changes and close the connection
+    conn.commit()
+    conn.close()
+
+    logging.info("Database created and sample data inserted.")
+
+def run_sql_query(db_path: str, query: str, output_path: Optional[str] = None):
+    """
+    Run the provided query through the pooled SQLite query layer.
 
-        # Execute the query
-        cursor.execute(query)
+    SELECTs use a read-only connection; with output_path the rows are streamed
+    to that file in fetchmany batches instead of being returned.
+    """
+    try:
+        logging.info(f"Running query on {db_path}: {query}")
 
-        # If the query is a SELECT, fetch the results
         if query.strip().lower().startswith("select"):
-            results = cursor.fetchall()
-            print(f"Query results: {results}")
+            if output_path:
+                row_count = stream_query(db_path, query, output_path)
+                logging.info(f"Query results: {row_count} rows saved to {output_path}")
+                return f"Query results saved to {output_path}"
+
+            with get_pool(db_path).connection() as conn:
+                results = conn.execute(query).fetchall()
+            logging.info(f"Query results: {results}")
             return results
 
-        # Commit changes for non-SELECT queries (INSERT, UPDATE, DELETE)
-        conn.commit()
-        print("Query executed successfully.")
+        # Non-SELECT queries (INSERT, UPDATE, DELETE) commit on a writable pooled connection
+        with get_pool(db_path, readonly=False).connection() as conn:
+            conn.execute(query)
+        logging.info("Query executed successfully.")
         return "Query executed successfully."
 
-    except sqlite3.Error as e:
-        print(f"SQLite error: {e}")
+    except (sqlite3.Error, QueryTimeout, FileNotFoundError) as e:
+        logging.error(f"SQLite error: {e}")
         return f"SQLite error: {e}"
 
-    finally:
-        # Close the connection
-        conn.close()
-
-# Example query to select all rows from the sales table
-query = "SELECT * FROM sales LIMIT 10;"  # Adjust this based on your database schema
-
-# Call the function
-result = run_sql_query(db_path, query)
-print(result)
-
-def scrape_website(url: str, output_path: str):
+def scrape_website(url: str, output_path: str, selectors: Optional[List[str]] = None):
     """
     Scrape data from a website and save it to a file
+
+    Matches are extracted while the page streams in, so the page is never
+    parsed into a full tree. Each match is written on its own line.
+
+    :param selectors: CSS selectors (tag, .class, #id, [attr], descendant / child,
+        "@attr" for attribute values); defaults to SCRAPE_SELECTORS ("p")
     """
+    import httpx
+    from app.config import SCRAPE_SELECTORS
+    from app.fetcher import fetch_url
+    from app.html_extract import StreamingExtractor, charset_from_content_type
+
     try:
         # Ensure the directory exists
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
-        # Fetch the content of the webpage
-        response = requests.get(url)
-        response.raise_for_status()  # Ensure the request was successful
-
-        # Parse the page content with BeautifulSoup
-        soup = BeautifulSoup(response.content, 'html.parser')
+        # Decoded with the Content-Type charset, else a BOM / <meta charset> sniff
+        parser = StreamingExtractor(selectors or SCRAPE_SELECTORS)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            written = 0
 
-        # Example: Extract all paragraph texts from the page
-        paragraphs = soup.find_all('p')
-        text_data = "\n".join([p.get_text() for p in paragraphs])
+            def extract(chunk: bytes):
+                nonlocal written
+                parser.feed(chunk)
+                for _, text in parser.results():
+                    f.write(("\n" if written else "") + text)
+                    written += 1
 
-        # Save the scraped data to a file
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(text_data)
+            fetch_url(url, sink=extract,
+                      on_headers=lambda headers: parser.set_encoding(charset_from_content_type(headers.get("content-type"))))
+            parser.close()
+            extract(b"")
 
-        print(f"Scraped data saved to {output_path}")
+        logging.info(f"Scraped data saved to {output_path}")
         return "Successfully scraped data"
     
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching webpage: {e}")
+    except httpx.HTTPError as e:
+        logging.error(f"Error fetching webpage: {e}")
         return f"Error fetching webpage: {e}"
     except Exception as e:
-        print(f"Error scraping data: {e}")
+        logging.error(f"Error scraping data: {e}")
         return f"Error scraping data: {e}"
 
-# Example Usage
-url = 'https://example.com'  # This is a test site
-output_path = 'data/scraped_data.txt'  # Path to save the scraped data
-
-# Call the function
-result = scrape_website(url, output_path)
-print(result)
-
 def compress_and_resize_image(input_image_path: str, output_image_path: str, resize_dimensions=(800, 800), quality=85):
     """
     Compress and resize the image.
@@ -251,149 +247,205 @@ def compress_and_resize_image(input_image_path: str, output_image_path: str, res
     :param resize_dimensions: Tuple with new dimensions (width, height).
     :param quality: Quality for the compressed image (1-100).
     """
+    from app.images import process_image
+
     try:
-        # Open the input image
-        with Image.open(input_image_path) as img:
-            # Resize the image using LANCZOS resampling (replaces ANTIALIAS)
-            img = img.resize(resize_dimensions, Image.Resampling.LANCZOS)
-            
-            # Save the resized and compressed image
-            img.save(output_image_path, "JPEG", quality=quality)
+        # Aspect ratio is kept: the image is fitted inside resize_dimensions
+        width, height = process_image(input_image_path, output_image_path, resize_dimensions, quality)
         
-        logging.info(f"Image successfully compressed and resized. Saved to {output_image_path}")
+        logging.info(f"Image successfully compressed and resized to {width}x{height}. Saved to {output_image_path}")
         return "Successfully compressed and resized the image"
     
     except Exception as e:
         logging.error(f"Error compressing and resizing image: {str(e)}")
         return f"Failed to compress and resize image: {str(e)}"
 
-# Example usage
-input_image_path = r"C:\Users\B Varun karthik\Pictures\trlzN6b.jpg"  # Your input image path
-output_image_path = r"data\compressed_resized_image.jpg"  # Path to save the resized and compressed image
 
-result = compress_and_resize_image(input_image_path, output_image_path)
-print(result)
+def compress_and_resize_images(source: str, output_dir: str, resize_dimensions=(800, 800), quality=85):
+    """
+    Compress and resize every image in a directory or glob, skipping up-to-date outputs.
 
+    :param source: Directory or glob pattern of input images.
+    :param output_dir: Directory the JPEGs are written to.
+    :param resize_dimensions: Bounding box (width, height).
+    :param quality: Quality for the compressed images (1-100).
+    """
+    from app.images import process_images
 
+    try:
+        stats = process_images(source, output_dir, resize_dimensions, quality)
+        return (f"Processed {stats['processed']} images, skipped {stats['skipped']}, failed {stats['failed']} "
+                f"({stats['images_per_second']} images/sec)")
+    except Exception as e:
+        logging.error(f"Error processing images: {str(e)}")
+        return f"Failed to process images: {str(e)}"
 
-def filter_csv_and_return_json(csv_file: str, filter_column: str, filter_value: str):
+def filter_csv_and_return_json(csv_file: str, filter_column: str, filter_value: str,
+                               output_path: str = "data/filtered_data.json", output_format: str = "json",
+                               columns: Optional[List[str]] = None):
     """
-    Filters CSV data based on a column and value, then returns the data as JSON.
+    Filters CSV data based on a column and value, then saves the matches as JSON.
+
+    The filter runs in DuckDB with projection and predicate pushdown, and rows
+    stream straight to output_path ("json" array or "ndjson") without being
+    collected in memory. CSV, JSON and Parquet inputs are supported.
     """
+    from app.analytics import export, filter_sql, source
+
     try:
         # Check if the CSV file exists
         if not os.path.exists(csv_file):
             raise HTTPException(status_code=404, detail=f"File not found: {csv_file}")
 
-        # Open the CSV file and read its content
-        with open(csv_file, mode='r', encoding='utf-8') as file:
-            csv_reader = csv.DictReader(file)
-            filtered_data = [
-                row for row in csv_reader if row[filter_column] == filter_value
-            ]
-
-        # If filtered data is found, return it as JSON
-        if filtered_data:
-            json_data = json.dumps(filtered_data, indent=4)
-            output_path = "data/filtered_data.json"  # Path to save the filtered data
-            with open(output_path, 'w', encoding='utf-8') as json_file:
-                json_file.write(json_data)
-            print(f"Filtered data saved to {output_path}")
+        # Columns stay strings, as csv.DictReader returns them
+        sql, params = filter_sql(source(csv_file, all_varchar=True), {filter_column: filter_value}, columns)
+        row_count = export(sql, output_path, params, fmt=output_format)
+
+        if row_count:
+            logging.info(f"Filtered data saved to {output_path}")
             return f"Filtered data saved to {output_path}"
 
         else:
+            # export() already left an empty result ([] or an empty NDJSON file) at output_path
             raise HTTPException(status_code=404, detail="No matching data found.")
     
     except Exception as e:
-        print(f"Error processing CSV: {str(e)}")
+        logging.error(f"Error processing CSV: {str(e)}")
         return f"Error processing CSV: {str(e)}"
 
-# Example Usage for CSV filtering
-csv_file = "C:/Users/B Varun karthik/dataworks-agent/data/sample.csv"
-filter_column = "product_name"  # Column to filter by
-filter_value = "Product A"  # Value to filter by
-
-# Call the function
-result = filter_csv_and_return_json(csv_file, filter_column, filter_value)
-print(result)
-
+def transcribe_audio(mp3_file_path: str, output_text_path: str):
+    """
+    Transcribes audio from an MP3 file to text using Whisper.
 
-def setup_ffmpeg_paths():
-    """Ensures FFmpeg and FFprobe are correctly set for pydub."""
-    ffmpeg_path = r"C:\Program Files\ffmpeg\ffmpeg-7.1-essentials_build\bin\ffmpeg.exe"
-    ffprobe_path = r"C:\Program Files\ffmpeg\ffmpeg-7.1-essentials_build\bin\ffprobe.exe"
+    The MP3 is decoded to 16 kHz samples in memory (no temporary WAV) and
+    transcribed by resident models; long files are split across worker processes.
 
-    if not os.path.exists(ffmpeg_path) or not os.path.exists(ffprobe_path):
-        raise FileNotFoundError("❌ FFmpeg or FFprobe not found. Please check the installation path.")
+    Args:
+        mp3_file_path (str): Path to the MP3 file.
+        output_text_path (str): Path to save the transcribed text.
+    """
+    from app.transcription import transcribe_file
 
-    AudioSegment.converter = ffmpeg_path
-    AudioSegment.ffprobe = ffprobe_path
-    print(f"✅ FFmpeg Path: {AudioSegment.converter}")
-    print(f"✅ FFprobe Path: {AudioSegment.ffprobe}")
+    try:
+        logging.info("Transcribing audio...")
+        stats = transcribe_file(mp3_file_path, output_text_path)
 
-def convert_mp3_to_wav(mp3_file_path: str) -> str:
-    """Convert MP3 file to WAV using pydub and return WAV file path."""
-    if not os.path.exists(mp3_file_path):
-        raise FileNotFoundError(f"❌ MP3 file not found: {mp3_file_path}")
+        logging.info(f"Transcription successful! Saved to {output_text_path} (real-time factor {stats['real_time_factor']})")
 
-    wav_file_path = mp3_file_path.replace(".mp3", ".wav")
+        return "Successfully transcribed MP3 to text."
 
-    try:
-        audio = AudioSegment.from_mp3(mp3_file_path)
-        audio.export(wav_file_path, format="wav")
-        print(f"✅ Successfully converted MP3 to WAV: {wav_file_path}")
-        return wav_file_path
+    except FileNotFoundError as e:
+        logging.error(str(e))
+        return str(e)
     except Exception as e:
-        raise RuntimeError(f"❌ Error converting MP3 to WAV: {str(e)}")
+        logging.error(f"Error transcribing audio: {str(e)}")
+        return f"Error transcribing audio: {str(e)}"
 
-def transcribe_audio(mp3_file_path: str, output_text_path: str):
+
+def register_tasks(registry):
     """
-    Transcribes audio from an MP3 file to text using Whisper.
+    Plugin hook: adds the Phase B tasks to a TaskRegistry
 
-    Args:
-        mp3_file_path (str): Path to the MP3 file.
-        output_text_path (str): Path to save the transcribed text.
+    Only the phrases are registered here; each task imports its own
+    dependencies the first time it runs. A task is only registered when its
+    default inputs exist at startup, and tasks that call out to the network
+    only when PHASE_B_NETWORK_TASKS=1.
     """
-    try:
-        setup_ffmpeg_paths()
+    # (phrase, handler, pool, default inputs, calls the network)
+    for phrase, handler, pool, inputs, network in [
+        # B3 - Fetch API data
+        ("fetch data from api", lambda: fetch_api_data("https://jsonplaceholder.typicode.com/posts", "data/api_response.json"), "default", [], True),
+
+        # B5 - SQL query
+        ("run sql query on sales", lambda: run_sql_query("data/ticket-sales.db", "SELECT * FROM sales LIMIT 10;", "data/sales-query.json"), "default", ["data/ticket-sales.db"], False),
+
+        # B6 - Scrape website
+        ("scrape website", lambda: scrape_website("https://example.com", "data/scraped_data.txt"), "default", [], True),
+
+        # B7 - Compress / resize image
+        ("compress and resize image", lambda: compress_and_resize_images("data/images", "data/images-resized"), "default", ["data/images"], False),
+
+        # B8 - Transcribe audio
+        ("transcribe audio", lambda: transcribe_audio("data/Under-The-Influence.mp3", "data/transcribed_text.txt"), "model", ["data/Under-The-Influence.mp3"], False),
+
+        # B9 - Markdown to HTML
+        ("convert markdown to html", lambda: convert_markdown_to_html("data/example.md", "data/example.html"), "default", ["data/example.md"], False),
+        ("convert markdown docs to html", lambda: convert_markdown_tree_to_html("data/docs", "data/docs-html"), "default", ["data/docs"], False),
+
+        # B10 - Filter CSV
+        ("filter csv to json", lambda: filter_csv_and_return_json("data/sample.csv", "product_name", "Product A"), "default", ["data/sample.csv"], False),
+    ]:
+        missing = [path for path in inputs if not os.path.exists(path)]
+        if missing:
+            logging.info(f"Not registering '{phrase}': missing {', '.join(missing)}")
+        elif network and not PHASE_B_NETWORK_TASKS:
+            logging.info(f"Not registering '{phrase}': network tasks are off (PHASE_B_NETWORK_TASKS=1 enables them)")
+        else:
+            registry.register(phrase, handler, pool)
 
-        # Convert MP3 to WAV
-        wav_file_path = convert_mp3_to_wav(mp3_file_path)
 
-        # Load Whisper model
-        print("⏳ Loading Whisper model...")
-        model = whisper.load_model("base")
+def run_examples():
+    """Runs every Phase B task once with the original sample inputs."""
+    input_path = "data/example.md"  # Make sure this is the correct path
+    output_path = "data/example.html"  # The output HTML file path
 
-        # Transcribe the audio file
-        print("⏳ Transcribing audio...")
-        result = model.transcribe(wav_file_path)
+    result = convert_markdown_to_html(input_path, output_path)
+    logging.info(result)
 
-        # Get the transcribed text
-        transcribed_text = result['text']
+    # Example Usage
+    repo_url = "https://github.com/VarunKarthik-18/dataworks-agent.git"  # Replace with your repo URL
+    commit_message = "Automated commit: added new file"
+    clone_dir = "C:/Users/B Varun karthik/dataworks-agent/cloned_repo"  # Directory to clone into
 
-        # Write the transcribed text to a file
-        with open(output_text_path, 'w', encoding='utf-8') as f:
-            f.write(transcribed_text)
+    # Call the clone_and_commit_repo function
+    result = clone_and_commit_repo(repo_url, commit_message, clone_dir)
+    logging.info(result)
 
-        print(f"✅ Transcription successful! Saved to {output_text_path}")
+    # Path to SQLite database
+    db_path = r"C:\Users\B Varun karthik\dataworks-agent\data\ticket-sales.db"
+    create_sample_sales_db(db_path)
 
-        # Cleanup WAV file after transcription
-        os.remove(wav_file_path)
-        print(f"🗑️ Removed temporary WAV file: {wav_file_path}")
+    # Example query to select all rows from the sales table
+    query = "SELECT * FROM sales LIMIT 10;"  # Adjust this based on your database schema
 
-        return "Successfully transcribed MP3 to text."
+    # Call the function
+    result = run_sql_query(db_path, query)
+    logging.info(result)
 
-    except FileNotFoundError as e:
-        print(f"❌ {e}")
-        return str(e)
-    except Exception as e:
-        print(f"❌ Error transcribing audio: {str(e)}")
-        return f"Error transcribing audio: {str(e)}"
+    # Example Usage
+    url = 'https://example.com'  # This is a test site
+    output_path = 'data/scraped_data.txt'  # Path to save the scraped data
+
+    # Call the function
+    result = scrape_website(url, output_path)
+    logging.info(result)
+
+    # Example usage
+    input_image_path = r"C:\Users\B Varun karthik\Pictures\trlzN6b.jpg"  # Your input image path
+    output_image_path = r"data\compressed_resized_image.jpg"  # Path to save the resized and compressed image
+
+    result = compress_and_resize_image(input_image_path, output_image_path)
+    logging.info(result)
+
+    # Example Usage for CSV filtering
+    csv_file = "C:/Users/B Varun karthik/dataworks-agent/data/sample.csv"
+    filter_column = "product_name"  # Column to filter by
+    filter_value = "Product A"  # Value to filter by
+
+    # Call the function
+    result = filter_csv_and_return_json(csv_file, filter_column, filter_value)
+    logging.info(result)
+
+    # Example usage
+    mp3_file_path = r"C:\Users\B Varun karthik\dataworks-agent\data\Under-The-Influence.mp3"
+    output_text_path = r"C:\Users\B Varun karthik\dataworks-agent\data\transcribed_text.txt"
+
+    # Call the function
+    result = transcribe_audio(mp3_file_path, output_text_path)
+    logging.info(result)
 
-# Example usage
-mp3_file_path = r"C:\Users\B Varun karthik\dataworks-agent\data\Under-The-Influence.mp3"
-output_text_path = r"C:\Users\B Varun karthik\dataworks-agent\data\transcribed_text.txt"
 
-# Call the function
-result = transcribe_audio(mp3_file_path, output_text_path)
-print(result)
\ No newline at end of file
+if __name__ == "__main__":
+    # Ensure logging is configured properly (e.g., in the main script)
+    logging.basicConfig(level=logging.INFO)
+    run_examples()
@@ -0,0 +1,79 @@
+"""
+Exercises app.fetcher against a local stand-in HTTP server (no network needed).
+
+    python test_fetcher.py
+"""
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.fetcher import ResponseCache, fetch_urls
+
+BODY = b'{"id": 1, "title": "stand-in"}\n' * 2000
+ETAG = '"' + hashlib.sha1(BODY).hexdigest() + '"'
+stats = {"requests": 0, "not_modified": 0, "active": 0, "max_active": 0}
+lock = threading.Lock()
+
+
+class StandIn(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        with lock:
+            stats["requests"] += 1
+            stats["active"] += 1
+            stats["max_active"] = max(stats["max_active"], stats["active"])
+        try:
+            time.sleep(0.05)
+            if self.path.startswith("/missing"):
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+            elif self.headers.get("If-None-Match") == ETAG:
+                with lock:
+                    stats["not_modified"] += 1
+                self.send_response(304)
+                self.send_header("ETag", ETAG)
+                self.end_headers()
+            else:
+                self.send_response(200)
+                self.send_header("ETag", ETAG)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(BODY)))
+                self.end_headers()
+                self.wfile.write(BODY)
+        finally:
+            with lock:
+                stats["active"] -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+if __name__ == "__main__":
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResponseCache(os.path.join(tmp, "cache"))
+        targets = {f"{base}/posts/{i}": os.path.join(tmp, f"post-{i}.json") for i in range(12)}
+        targets[f"{base}/missing"] = os.path.join(tmp, "missing.json")
+
+        first = fetch_urls(targets, cache=cache, per_host=3)
+        assert stats["max_active"] <= 3, stats
+        assert all(r.get("status") == 200 for r in first[:-1]) and "error" in first[-1], first
+        for url, path in list(targets.items())[:-1]:
+            with open(path, "rb") as f:
+                assert f.read() == BODY, path
+
+        second = fetch_urls(targets, cache=cache, per_host=3)
+        assert all(r.get("cached") for r in second[:-1]), second
+        assert stats["not_modified"] == 12, stats
+        print(f"OK: {stats['requests']} requests, {stats['not_modified']} answered 304, "
+              f"max {stats['max_active']} concurrent per host")
+
+    server.shutdown()